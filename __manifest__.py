@@ -2,7 +2,7 @@
 {
     'name': 'Gestión de Copas de Béisbol',
     'category': 'Sports',
-    'version': '1.0',
+    'version': '1.1',
     'summary': 'Módulo para gestionar copas y torneos de béisbol',
     'description': """
         Módulo para la gestión integral de copas y torneos de béisbol.
@@ -11,10 +11,14 @@
         - Gestión de múltiples copas de béisbol
         - Registro de equipos, jugadores y árbitros
         - Generación automática de calendario (round-robin)
+        - Generación de calendario y tabla en trabajos en segundo plano
+        - Reprogramación de partidos suspendidos en horarios libres
+        - Sedes con horarios y terrenos configurables
         - Tabla de posiciones automática
         - Semifinal y final automáticas
-        - Integración con calendario de Odoo
+        - Integración con calendario de Odoo (eventos por lotes con capitanes y árbitros)
         - Páginas públicas web estilo béisbol
+        - Calendarios iCalendar por copa, equipo y árbitro para suscribirse
     """,
     'author': 'Robert LS',
     'website': 'https://www.yourcompany.com',
@@ -24,13 +28,20 @@
         'security/beiscool_security.xml',
         'security/ir.model.access.csv',
         # Las vistas deben cargarse antes que el menú para que las acciones existan
+        'wizard/beiscool_match_reschedule_views.xml',
         'views/copa_views.xml',
         'views/player_views.xml',
         'views/team_views.xml',
         'views/match_views.xml',
         'views/referee_views.xml',
         'views/standings_views.xml',
+        'views/venue_views.xml',
+        'views/perf_sample_views.xml',
+        'views/job_views.xml',
         'views/beiscool_menu.xml',
+        'data/beiscool_server_actions.xml',
+        'data/beiscool_job_cron.xml',
+        'data/beiscool_calendar_cron.xml',
         # Plantillas QWeb para páginas públicas
         'static/src/xml/copa_page.xml',
     ],
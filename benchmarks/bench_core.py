@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks del núcleo del torneo (core/), sin servidor ni base de datos.
+
+Uso:
+    python benchmarks/bench_core.py
+    python benchmarks/bench_core.py --sizes 8 100 1000 --repeat 5 --budget 0.5
+
+Mide, por cantidad de equipos, el mejor tiempo de `repeat` corridas de:
+- generate:  round_robin.generate (clásico)
+- balance:   round_robin.balance_home_away
+- slots:     scheduling.assign_slots con un terreno por cruce de la jornada
+- optimize:  round_robin.generate canónico + scheduling.optimize_home_away
+             (acotado por --budget) y sus métricas de calidad
+- standings: core.standings.standings_contributions con todos los partidos jugados
+- ranking:   core.standings.counters_values + core.tiebreak.positions
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import sys
+import time
+from datetime import date
+
+DEFAULT_SIZES = (8, 16, 32, 64, 128, 256, 512, 1000)
+
+
+def load_core():
+    """Carga core/ por ruta: no importa el módulo de Odoo ni odoo"""
+    core_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'core')
+    spec = importlib.util.spec_from_file_location(
+        'beiscool_core', os.path.join(core_dir, '__init__.py'),
+        submodule_search_locations=[core_dir],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def best_of(repeat, function):
+    """Mejor tiempo (segundos) y último resultado de `repeat` corridas"""
+    best = None
+    result = None
+    for _i in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run(core, sizes, repeat, budget, seed):
+    round_robin = core.round_robin
+    scheduling = core.scheduling
+    standings = core.standings
+    tiebreak = core.tiebreak
+
+    header = '%6s %9s %10s %10s %10s %10s %10s %10s   %s' % (
+        'teams', 'fixtures', 'generate', 'balance', 'slots', 'optimize',
+        'standings', 'ranking', 'breaks/spread/hours (optimizado)',
+    )
+    print(header)
+    print('-' * len(header))
+
+    for size in sizes:
+        team_ids = list(range(1, size + 1))
+        rng = random.Random(seed + size)
+
+        t_generate, fixtures = best_of(repeat, lambda: round_robin.generate(team_ids))
+        t_balance, balanced = best_of(repeat, lambda: round_robin.balance_home_away(fixtures, team_ids))
+
+        # Capacidad suficiente para una jornada por día
+        templates = {weekday: [(10.0, 1, max(1, size // 2))] for weekday in range(7)}
+
+        def slots():
+            days = scheduling.iter_schedule_days(date(2025, 1, 4), templates)
+            return scheduling.assign_slots(balanced, days, size)
+        t_slots, _scheduled = best_of(repeat, slots)
+
+        def optimize():
+            canonical = round_robin.generate(team_ids, canonical=True)
+            optimized = scheduling.optimize_home_away(canonical, time_budget=budget, seed=seed)
+            days = scheduling.iter_schedule_days(date(2025, 1, 4), {
+                weekday: [(9.5, 1, max(1, size // 4)), (12.0, 1, max(1, size // 4))]
+                for weekday in range(7)
+            })
+            return scheduling.schedule_metrics(scheduling.assign_slots(optimized, days, size))
+        t_optimize, metrics = best_of(1, optimize)
+
+        played = [
+            (1, home_id, away_id, rng.randint(0, 12), rng.randint(0, 12))
+            for _round, home_id, away_id in fixtures
+        ]
+        t_standings, totals = best_of(repeat, lambda: standings.standings_contributions(played))
+
+        def ranking():
+            rows = []
+            for (_copa_id, team_id), counters in totals.items():
+                values = standings.counters_values(counters)
+                rows.append((
+                    team_id, team_id, values['matches_won'], values['run_differential'],
+                    values['runs_scored'], standings.merge_head_to_head({}, counters),
+                ))
+            return tiebreak.positions(rows)
+        t_ranking, _positions = best_of(repeat, ranking)
+
+        print('%6d %9d %9.4fs %9.4fs %9.4fs %9.4fs %9.4fs %9.4fs   %s/%s/%.2f' % (
+            size, len(fixtures), t_generate, t_balance, t_slots, t_optimize,
+            t_standings, t_ranking, metrics[0], metrics[1], metrics[2],
+        ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='cantidades de equipos a medir')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='corridas por medición (se reporta la mejor)')
+    parser.add_argument('--budget', type=float, default=0.5,
+                        help='segundos de búsqueda local por tamaño')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    run(load_core(), args.sizes, max(args.repeat, 1), args.budget, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,5 @@
 # -*- coding: utf-8 -*-
 
 from . import beiscool_website
+from . import beiscool_api
+from . import beiscool_ics
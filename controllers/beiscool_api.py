@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+
+from odoo import http, fields
+from odoo.http import request, Response
+
+# Campos que se pueden pedir en ?fields=a,b,c (lista blanca por modelo)
+MATCH_API_FIELDS = (
+    'id', 'name', 'match_date', 'stage', 'state', 'sequence',
+    'home_team_id', 'away_team_id', 'home_runs', 'away_runs',
+    'winner_id', 'display_score',
+)
+
+MATCH_API_DEFAULT_FIELDS = (
+    'id', 'match_date', 'stage', 'state',
+    'home_team_id', 'away_team_id', 'home_runs', 'away_runs',
+)
+
+STANDINGS_API_FIELDS = (
+    'id', 'position', 'team_id', 'matches_played', 'matches_won',
+    'matches_lost', 'runs_scored', 'runs_allowed', 'run_differential',
+    'points',
+)
+
+# Tamaño de página por defecto y máximo permitido
+API_DEFAULT_LIMIT = 50
+API_MAX_LIMIT = 100
+
+# Segundos que un cliente o proxy puede reutilizar una respuesta
+API_MAX_AGE = 30
+
+
+class BeiscoolApiError(Exception):
+    """Parámetro inválido en una petición a la API (respuesta 400)"""
+
+
+class BeiscoolApi(http.Controller):
+    """API JSON de solo lectura: tabla de posiciones, calendario y resultados"""
+
+    # ============================================
+    # UTILIDADES
+    # ============================================
+
+    def _parse_fields(self, allowed, default):
+        """Campos pedidos en ?fields=, limitados a la lista blanca"""
+        requested = request.params.get('fields')
+        if not requested:
+            return list(default)
+        names = [name.strip() for name in requested.split(',') if name.strip()]
+        invalid = [name for name in names if name not in allowed]
+        if invalid:
+            raise BeiscoolApiError('Campos no permitidos: %s' % ', '.join(invalid))
+        return names
+
+    def _parse_int(self, name, default, minimum=0, maximum=None):
+        value = request.params.get(name)
+        if value in (None, ''):
+            return default
+        try:
+            value = int(value)
+        except ValueError:
+            raise BeiscoolApiError('El parámetro %s debe ser un entero.' % name)
+        if value < minimum:
+            raise BeiscoolApiError('El parámetro %s debe ser mayor o igual a %s.' % (name, minimum))
+        if maximum is not None:
+            value = min(value, maximum)
+        return value
+
+    def _parse_date(self, name):
+        value = request.params.get(name)
+        if not value:
+            return False
+        try:
+            return fields.Date.to_date(value)
+        except ValueError:
+            raise BeiscoolApiError('El parámetro %s debe tener formato AAAA-MM-DD.' % name)
+
+    def _parse_pagination(self):
+        limit = self._parse_int('limit', API_DEFAULT_LIMIT, minimum=1, maximum=API_MAX_LIMIT)
+        page = self._parse_int('page', 1, minimum=1)
+        return limit, (page - 1) * limit
+
+    def _json_response(self, data, etag=None, last_modified=None, status=200):
+        response = request.make_json_response(data, headers=[
+            ('Cache-Control', 'public, max-age=%s' % API_MAX_AGE),
+            ('Vary', 'Accept-Encoding'),
+        ], status=status)
+        if etag:
+            response.set_etag(etag)
+        if last_modified:
+            response.last_modified = last_modified
+        return response
+
+    def _error_response(self, message, status):
+        response = request.make_json_response({'error': message}, status=status)
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    def _not_modified(self, etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'public, max-age=%s' % API_MAX_AGE
+        return response
+
+    def _dispatch(self, copa_id, resource, build):
+        """
+        Respuesta común: valida que la copa exista con una sola consulta,
+        responde 304 si el ETag del cliente corresponde a la versión pública
+        actual de la copa y, si no, construye el cuerpo con build().
+        """
+        version = request.env['beiscool.copa'].sudo()._read_public_version(copa_id)
+        if not version:
+            return self._error_response('No encontrado.', 404)
+        public_version, public_write_date = version
+
+        query_hash = hashlib.sha1(request.httprequest.query_string).hexdigest()[:12]
+        etag = 'api-%s-%s-%s-%s' % (resource, copa_id, public_version, query_hash)
+        if request.httprequest.if_none_match.contains(etag):
+            return self._not_modified(etag)
+
+        try:
+            data = build()
+        except BeiscoolApiError as e:
+            return self._error_response(str(e), 400)
+        return self._json_response(data, etag=etag, last_modified=public_write_date)
+
+    def _read_matches(self, domain, order):
+        """Una página de partidos leída en un solo search_read por lotes"""
+        field_names = self._parse_fields(MATCH_API_FIELDS, MATCH_API_DEFAULT_FIELDS)
+        limit, offset = self._parse_pagination()
+
+        state = request.params.get('state')
+        if state:
+            if state not in ('scheduled', 'played', 'cancelled'):
+                raise BeiscoolApiError('Estado inválido: %s' % state)
+            domain = domain + [('state', '=', state)]
+
+        date_from = self._parse_date('date_from')
+        if date_from:
+            domain = domain + [('match_date', '>=', date_from)]
+        date_to = self._parse_date('date_to')
+        if date_to:
+            domain = domain + [('match_date', '<', fields.Date.add(date_to, days=1))]
+
+        Match = request.env['beiscool.match'].sudo()
+        return {
+            'count': Match.search_count(domain),
+            'limit': limit,
+            'offset': offset,
+            'records': Match.search_read(
+                domain, field_names, offset=offset, limit=limit, order=order,
+            ),
+        }
+
+    # ============================================
+    # RUTAS
+    # ============================================
+
+    @http.route('/beiscool/api/copa/<int:copa_id>/standings', type='http', auth='public',
+                methods=['GET'], cors='*', readonly=True)
+    def api_standings(self, copa_id, **kwargs):
+        """Tabla de posiciones de una copa"""
+        def build():
+            field_names = self._parse_fields(STANDINGS_API_FIELDS, STANDINGS_API_FIELDS)
+            records = request.env['beiscool.standings'].sudo().search_read(
+                [('copa_id', '=', copa_id)], field_names, order='position, id',
+            )
+            return {'copa_id': copa_id, 'records': records}
+        return self._dispatch(copa_id, 'standings', build)
+
+    @http.route('/beiscool/api/copa/<int:copa_id>/schedule', type='http', auth='public',
+                methods=['GET'], cors='*', readonly=True)
+    def api_schedule(self, copa_id, **kwargs):
+        """
+        Calendario de una copa, paginado.
+        Parámetros: date_from, date_to (AAAA-MM-DD), state, page, limit, fields
+        """
+        def build():
+            return self._read_matches(
+                [('copa_id', '=', copa_id), ('match_date', '!=', False)],
+                'match_date, sequence, id',
+            )
+        return self._dispatch(copa_id, 'schedule', build)
+
+    @http.route('/beiscool/api/copa/<int:copa_id>/results', type='http', auth='public',
+                methods=['GET'], cors='*', readonly=True)
+    def api_results(self, copa_id, **kwargs):
+        """Resultados de una copa, del más reciente al más antiguo, paginados"""
+        def build():
+            return self._read_matches(
+                [('copa_id', '=', copa_id), ('state', '=', 'played')],
+                'match_date desc, sequence desc, id desc',
+            )
+        return self._dispatch(copa_id, 'results', build)
+
+    @http.route('/beiscool/api/team/<int:team_id>/matches', type='http', auth='public',
+                methods=['GET'], cors='*', readonly=True)
+    def api_team_matches(self, team_id, **kwargs):
+        """
+        Partidos de un equipo (local y visitante) en su copa, paginados.
+        Parámetros: date_from, date_to, state, page, limit, fields
+        """
+        team = request.env['beiscool.team'].sudo().search_read(
+            [('id', '=', team_id)], ['copa_id'], load=None,
+        )
+        if not team or not team[0]['copa_id']:
+            return self._error_response('No encontrado.', 404)
+        copa_id = team[0]['copa_id']
+
+        def build():
+            return self._read_matches(
+                [
+                    ('copa_id', '=', copa_id),
+                    '|',
+                    ('home_team_id', '=', team_id),
+                    ('away_team_id', '=', team_id),
+                ],
+                'match_date, sequence, id',
+            )
+        return self._dispatch(copa_id, 'team-%s' % team_id, build)
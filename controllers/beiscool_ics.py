@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime, timedelta
+
+from odoo import http
+from odoo.http import request, Response
+
+from ..core.scheduling import DEFAULT_GAME_DURATION
+from ..models.beiscool_perf_sample import BeiscoolPerfProbe
+
+# Versión del formato generado: cambiarla invalida los ETag de los clientes
+ICS_FORMAT_VERSION = 2
+
+# Partidos leídos por consulta al generar un feed
+ICS_BATCH_SIZE = 500
+
+# Segundos que un cliente puede reutilizar el feed sin revalidar
+ICS_MAX_AGE = 300
+
+# Alcance de cada feed: (tabla del registro, condición de sus partidos)
+ICS_SCOPES = {
+    'copa': ('beiscool_copa', 'm.copa_id = e.id'),
+    'team': ('beiscool_team', '(m.home_team_id = e.id OR m.away_team_id = e.id)'),
+    'referee': ('beiscool_referee', 'm.referee_id = e.id'),
+}
+
+ICS_STAGES = {
+    'round_robin': 'Round Robin',
+    'semifinal': 'Semifinal',
+    'final': 'Final',
+}
+
+
+def ics_escape(value):
+    """Texto de una propiedad iCalendar (RFC 5545, 3.3.11)"""
+    return (value or '').replace('\\', '\\\\').replace(';', '\\;') \
+        .replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n')
+
+
+def ics_line(name, value):
+    """Línea de contenido terminada en CRLF y plegada a 75 octetos"""
+    line = ('%s:%s' % (name, value)).encode('utf-8')
+    chunks = []
+    while len(line) > 75:
+        # No cortar una secuencia UTF-8 multibyte
+        cut = 75 if not chunks else 74
+        while cut and (line[cut] & 0xC0) == 0x80:
+            cut -= 1
+        chunks.append(line[:cut])
+        line = line[cut:]
+    chunks.append(line)
+    return b'\r\n '.join(chunks) + b'\r\n'
+
+
+def ics_datetime(value):
+    """Fecha y hora UTC, para las marcas reales (write_date)"""
+    return value.strftime('%Y%m%dT%H%M%SZ')
+
+
+def ics_local_datetime(value):
+    """
+    Fecha y hora flotante (sin zona): match_date guarda la hora local del
+    horario de la sede, sin conversión, y así la muestra el calendario.
+    """
+    return value.strftime('%Y%m%dT%H%M%S')
+
+
+class BeiscoolIcs(http.Controller):
+    """Feeds iCalendar públicos para suscribirse al calendario de partidos"""
+
+    @http.route('/beiscool/ics/copa/<int:record_id>.ics', type='http', auth='public',
+                methods=['GET'], readonly=True)
+    def ics_copa(self, record_id):
+        """Todos los partidos de una copa"""
+        return self._ics_feed('copa', record_id)
+
+    @http.route('/beiscool/ics/team/<int:record_id>.ics', type='http', auth='public',
+                methods=['GET'], readonly=True)
+    def ics_team(self, record_id):
+        """Partidos de un equipo, de local y de visitante"""
+        return self._ics_feed('team', record_id)
+
+    @http.route('/beiscool/ics/referee/<int:record_id>.ics', type='http', auth='public',
+                methods=['GET'], readonly=True)
+    def ics_referee(self, record_id):
+        """Partidos asignados a un árbitro, en todas sus copas"""
+        return self._ics_feed('referee', record_id)
+
+    def _ics_feed(self, scope, record_id):
+        """
+        Responde un feed con una sola consulta agregada cuando no cambió:
+        el ETag se forma con el sello del alcance (ver _read_feed_state),
+        así que un cliente al día recibe un 304 sin leer ningún partido.
+        Si cambió, el cuerpo se genera en streaming.
+        """
+        with BeiscoolPerfProbe(request.env, 'ics_%s' % scope,
+                               target='%s,%s' % (scope, record_id)) as probe:
+            state = self._read_feed_state(scope, record_id)
+            if not state:
+                return probe.attach(request.not_found())
+            name, last_modified, stamp = state
+
+            etag = 'ics-%s-%s-%s-%s' % (ICS_FORMAT_VERSION, scope, record_id, stamp)
+            headers = [('Cache-Control', 'public, max-age=%s' % ICS_MAX_AGE)]
+            if request.httprequest.if_none_match.contains(etag):
+                response = Response(status=304, headers=headers)
+            else:
+                response = Response(
+                    self._generate_feed(
+                        request.env.registry, request.httprequest.host, scope, record_id, name,
+                    ),
+                    headers=headers + [
+                        ('Content-Type', 'text/calendar; charset=utf-8'),
+                        ('Content-Disposition', 'inline; filename="%s-%s.ics"' % (scope, record_id)),
+                    ],
+                    direct_passthrough=True,
+                )
+                if last_modified:
+                    response.last_modified = last_modified
+            response.set_etag(etag)
+            return probe.attach(response)
+
+    def _read_feed_state(self, scope, record_id):
+        """
+        (nombre del registro, última modificación, sello del contenido), o
+        None si no existe. El sello cubre todo lo que se escribe en los
+        eventos: modificación y cantidad de partidos, versión pública de sus
+        copas (nombres de equipos, árbitros y copa, duración del partido) y
+        modificación de sus sedes.
+        """
+        table, condition = ICS_SCOPES[scope]
+        request.env.cr.execute("""
+            WITH matches AS (
+                SELECT m.write_date, m.copa_id, m.venue_id
+                  FROM {table} AS e
+                  JOIN beiscool_match AS m ON {condition}
+                 WHERE e.id = %(record_id)s
+            ), copas AS (
+                SELECT SUM(public_version) AS version, MAX(public_write_date) AS write_date
+                  FROM beiscool_copa
+                 WHERE id IN (SELECT copa_id FROM matches)
+            )
+            SELECT e.name,
+                   (SELECT MAX(write_date) FROM matches),
+                   (SELECT COUNT(*) FROM matches),
+                   copas.version,
+                   copas.write_date,
+                   (SELECT MAX(write_date)
+                      FROM beiscool_venue
+                     WHERE id IN (SELECT venue_id FROM matches))
+              FROM {table} AS e, copas
+             WHERE e.id = %(record_id)s
+        """.format(table=table, condition=condition), {'record_id': record_id})
+        row = request.env.cr.fetchone()
+        if not row:
+            return None
+        name, match_write, count, copa_version, copa_write, venue_write = row
+        stamp = '%s-%s-%s-%s' % (
+            match_write.strftime('%Y%m%d%H%M%S%f') if match_write else 0, count, copa_version or 0,
+            venue_write.strftime('%Y%m%d%H%M%S%f') if venue_write else 0,
+        )
+        last_modified = max(filter(None, (match_write, copa_write, venue_write)), default=None)
+        return name, last_modified, stamp
+
+    @staticmethod
+    def _generate_feed(registry, host, scope, record_id, name):
+        """
+        Genera el feed por partes. Corre después de terminar la petición,
+        con un cursor propio de solo lectura, y lee los partidos en lotes
+        de ICS_BATCH_SIZE por paginación de clave (match_date, id): nunca
+        carga todos los partidos ni registros del ORM.
+        """
+        table, condition = ICS_SCOPES[scope]
+
+        yield b''.join((
+            ics_line('BEGIN', 'VCALENDAR'),
+            ics_line('VERSION', '2.0'),
+            ics_line('PRODID', '-//Beiscool//Calendario de Partidos//ES'),
+            ics_line('CALSCALE', 'GREGORIAN'),
+            ics_line('METHOD', 'PUBLISH'),
+            ics_line('X-WR-CALNAME', ics_escape(name)),
+            ics_line('REFRESH-INTERVAL;VALUE=DURATION', 'PT%sM' % (ICS_MAX_AGE // 60)),
+        ))
+
+        with registry.cursor(readonly=True) as cr:
+            last_key = (datetime.min, 0)
+            while True:
+                cr.execute("""
+                    SELECT m.id, m.match_date, m.write_date, m.name, m.state, m.stage,
+                           m.home_runs, m.away_runs, home.name, away.name,
+                           copa.name, copa.location, copa.game_duration, venue.name
+                      FROM {table} AS e
+                      JOIN beiscool_match AS m ON {condition}
+                      JOIN beiscool_copa AS copa ON copa.id = m.copa_id
+                      JOIN beiscool_team AS home ON home.id = m.home_team_id
+                      JOIN beiscool_team AS away ON away.id = m.away_team_id
+                 LEFT JOIN beiscool_venue AS venue ON venue.id = m.venue_id
+                     WHERE e.id = %s
+                       AND m.match_date IS NOT NULL
+                       AND (m.match_date, m.id) > (%s, %s)
+                  ORDER BY m.match_date, m.id
+                     LIMIT %s
+                """.format(table=table, condition=condition),
+                    [record_id, last_key[0], last_key[1], ICS_BATCH_SIZE])
+                rows = cr.fetchall()
+                if rows:
+                    yield b''.join(BeiscoolIcs._format_event(row, host) for row in rows)
+                if len(rows) < ICS_BATCH_SIZE:
+                    break
+                last_key = (rows[-1][1], rows[-1][0])
+
+        yield ics_line('END', 'VCALENDAR')
+
+    @staticmethod
+    def _format_event(row, host):
+        (match_id, start, write_date, match_name, state, stage, home_runs, away_runs,
+         home_name, away_name, copa_name, copa_location, game_duration, venue_name) = row
+        if state == 'played':
+            summary = '%s %s - %s %s' % (home_name, home_runs or 0, away_runs or 0, away_name)
+        else:
+            summary = '%s vs %s' % (home_name, away_name)
+        stop = start + timedelta(minutes=round((game_duration or DEFAULT_GAME_DURATION) * 60))
+        lines = [
+            ics_line('BEGIN', 'VEVENT'),
+            ics_line('UID', 'beiscool-match-%s@%s' % (match_id, host)),
+            ics_line('DTSTAMP', ics_datetime(write_date or start)),
+            ics_line('DTSTART', ics_local_datetime(start)),
+            ics_line('DTEND', ics_local_datetime(stop)),
+            ics_line('SUMMARY', ics_escape(summary)),
+            ics_line('DESCRIPTION', ics_escape('%s - %s (%s)' % (
+                copa_name, match_name, ICS_STAGES.get(stage, stage)))),
+            ics_line('STATUS', 'CANCELLED' if state == 'cancelled' else 'CONFIRMED'),
+        ]
+        location = venue_name or copa_location
+        if location:
+            lines.append(ics_line('LOCATION', ics_escape(location)))
+        lines.append(ics_line('END', 'VEVENT'))
+        return b''.join(lines)
@@ -1,19 +1,142 @@
 # -*- coding: utf-8 -*-
 
 from odoo import http
-from odoo.http import request
+from odoo.http import request, Response
+from odoo.tools.lru import LRU
+
+from ..models.beiscool_image_mixin import IMAGE_SIZES
+from ..models.beiscool_perf_sample import BeiscoolPerfProbe
+
+# Modelos cuyas imágenes se sirven en /beiscool/image
+IMAGE_MODELS = ('beiscool.team', 'beiscool.player', 'beiscool.referee')
+
+# Copas por página en /copas
+COPAS_PER_PAGE = 12
+
+# Caché del cuerpo de las páginas por proceso: {clave: (etag, last_modified, html)}
+# Solo guarda el fragmento de la página (plantilla *_body), nunca el layout:
+# el layout del sitio lleva datos de la sesión (token CSRF, usuario) y se
+# renderiza en cada petición. La clave incluye la versión pública de la
+# copa, así que nunca se sirve un cuerpo desactualizado.
+_PAGE_CACHE = LRU(512)
 
 
 class BeiscoolWebsite(http.Controller):
     """Controlador para páginas públicas del módulo beiscool"""
 
+    def _is_page_cacheable(self):
+        """Solo se cachea lo que ve un visitante anónimo, fuera del modo debug"""
+        return request.env.user._is_public() and not request.session.debug
+
+    def _get_page_cache_key(self, *parts):
+        """Clave de caché: partes de la página + sitio, idioma y versión del registro"""
+        return parts + (
+            request.website.id,
+            request.lang.code,
+            request.env.registry.registry_sequence,
+        )
+
+    def _make_cached_response(self, etag, last_modified, html):
+        response = request.make_response(html, headers=[
+            ('Content-Type', 'text/html; charset=utf-8'),
+            # El navegador siempre revalida con If-None-Match / If-Modified-Since
+            ('Cache-Control', 'public, no-cache'),
+        ])
+        response.set_etag(etag)
+        if last_modified:
+            response.last_modified = last_modified
+        return response
+
+    def _render(self, template, values_getter, probe):
+        """
+        Render sin caché. Con la instrumentación encendida se renderiza
+        aquí mismo para medir la fase render.
+        """
+        with probe.phase('compute'):
+            values = values_getter()
+        response = request.render(template, values)
+        if probe.enabled:
+            with probe.phase('render'):
+                response.flatten()
+        return response
+
+    def _render_cached(self, cache_key, last_modified, template, values_getter, probe):
+        """
+        Sirve una página pública con el cuerpo tomado de la caché de render.
+        - Si el ETag del navegador coincide: 304 sin renderizar.
+        - Si el cuerpo está en caché: solo se renderiza el layout alrededor.
+        - Si no: se llama a values_getter(), se renderiza template + '_body'
+          y se guarda ese fragmento.
+        template debe mostrar page_body dentro de website.layout cuando se
+        recibe, y llamar a su plantilla _body si no. probe
+        (BeiscoolPerfProbe) mide las fases compute y render.
+        """
+        if not self._is_page_cacheable():
+            return self._render(template, values_getter, probe)
+        
+        key = self._get_page_cache_key(*cache_key)
+        etag = '-'.join(str(part) for part in key)
+        
+        if request.httprequest.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'public, no-cache'
+            return response
+        
+        cached = _PAGE_CACHE.get(key)
+        if cached is None:
+            with probe.phase('compute'):
+                values = values_getter()
+            with probe.phase('render'):
+                body = request.env['ir.ui.view']._render_template('%s_body' % template, values)
+            cached = _PAGE_CACHE[key] = (etag, last_modified, body)
+        etag, last_modified, body = cached
+        
+        # El layout se renderiza siempre con la sesión de esta petición
+        with probe.phase('render'):
+            html = request.render(template, {'page_body': body}, lazy=False)
+        return self._make_cached_response(etag, last_modified, html)
+
+    @http.route('/beiscool/image/<string:model>/<int:record_id>/<int:size>/<string:unique>',
+                type='http', auth='public', readonly=True)
+    def image(self, model, record_id, size, unique):
+        """
+        Variante redimensionada de una imagen. Cuando la huella de la URL
+        coincide con la imagen actual se sirve como inmutable (caché larga).
+        """
+        if model not in IMAGE_MODELS or size not in IMAGE_SIZES:
+            return request.not_found()
+        record = request.env[model].sudo().browse(record_id).exists()
+        if not record:
+            return request.not_found()
+        
+        stream = request.env['ir.binary']._get_image_stream_from(
+            record, 'image_%s' % size,
+            placeholder='web/static/img/placeholder.png',
+        )
+        return stream.get_response(immutable=unique == record.image_checksum)
+
     @http.route('/copa/<int:copa_id>', type='http', auth='public', website=True)
     def copa_page(self, copa_id):
         """Página pública de una copa de béisbol"""
-        copa = request.env['beiscool.copa'].sudo().browse(copa_id)
-        if not copa.exists():
+        # Única consulta necesaria para servir la copa desde la caché
+        version = request.env['beiscool.copa'].sudo()._read_public_version(copa_id)
+        if not version:
             return request.not_found()
+        public_version, public_write_date = version
         
+        copa = request.env['beiscool.copa'].sudo().browse(copa_id)
+        with BeiscoolPerfProbe(request.env, 'copa_page', copa_id=copa_id) as probe:
+            return probe.attach(self._render_cached(
+                ('copa', copa_id, public_version),
+                public_write_date,
+                'beiscool.copa_page',
+                lambda: self._prepare_copa_page_values(copa),
+                probe,
+            ))
+
+    def _prepare_copa_page_values(self, copa):
+        """Valores de la plantilla beiscool.copa_page"""
         # Obtener equipos con su información
         teams = copa.team_ids.sorted('name')
         
@@ -38,7 +161,7 @@ class BeiscoolWebsite(http.Controller):
             lambda m: m.match_date
         ).sorted('match_date')
         
-        values = {
+        return {
             'copa': copa,
             'teams': teams,
             'standings': standings,
@@ -47,8 +170,6 @@ class BeiscoolWebsite(http.Controller):
             'past_matches': past_matches,
             'all_matches': all_matches,
         }
-        
-        return request.render('beiscool.copa_page', values)
 
     @http.route('/equipo/<int:team_id>', type='http', auth='public', website=True)
     def team_page(self, team_id):
@@ -60,15 +181,20 @@ class BeiscoolWebsite(http.Controller):
         # Obtener la copa asociada
         copa = team.copa_id
         
-        # Forzar la carga de campos relacionados
-        team = request.env['beiscool.team'].sudo().search([('id', '=', team_id)])
-        team = team[0] if team else False
-        
-        if not team:
-            return request.not_found()
+        with BeiscoolPerfProbe(request.env, 'team_page', copa_id=copa.id,
+                               target='beiscool.team,%s' % team_id) as probe:
+            return probe.attach(self._render(
+                'beiscool.team_page',
+                lambda: self._prepare_team_page_values(team),
+                probe,
+            ))
+
+    def _prepare_team_page_values(self, team):
+        """Valores de la plantilla beiscool.team_page"""
+        copa = team.copa_id
         
         # Obtener partidos del equipo
-        matches = Copa = request.env['beiscool.match'].sudo().search([
+        matches = request.env['beiscool.match'].sudo().search([
             '|',
             ('home_team_id', '=', team.id),
             ('away_team_id', '=', team.id),
@@ -86,7 +212,7 @@ class BeiscoolWebsite(http.Controller):
         if copa:
             standings = copa.standings_ids.filtered(lambda s: s.team_id == team)
         
-        values = {
+        return {
             'team': team,
             'copa': copa,
             'players': players,
@@ -94,16 +220,69 @@ class BeiscoolWebsite(http.Controller):
             'upcoming_matches': upcoming_matches,
             'standings': standings,
         }
+
+    @http.route([
+        '/copas',
+        '/copas/page/<int:page>',
+    ], type='http', auth='public', website=True)
+    def copas_list(self, page=1, state=None, year=None, **kwargs):
+        """Página con la lista de copas, paginada y filtrable por estado y año"""
+        Copa = request.env['beiscool.copa'].sudo()
+        
+        if state not in dict(Copa._fields['state'].selection):
+            state = None
+        try:
+            year = int(year) if year else None
+        except ValueError:
+            year = None
         
-        return request.render('beiscool.team_page', values)
+        list_version, last_write_date = Copa._read_list_version()
+        with BeiscoolPerfProbe(request.env, 'copas_list') as probe:
+            return probe.attach(self._render_cached(
+                ('copas', list_version, page, state, year),
+                last_write_date,
+                'beiscool.copas_list_page',
+                lambda: self._prepare_copas_list_values(page, state, year),
+                probe,
+            ))
 
-    @http.route('/copas', type='http', auth='public', website=True)
-    def copas_list(self):
-        """Página con lista de todas las copas"""
-        copas = request.env['beiscool.copa'].sudo().search([])
+    def _prepare_copas_list_values(self, page, state, year):
+        """Valores de la plantilla beiscool.copas_list_page"""
+        Copa = request.env['beiscool.copa'].sudo()
         
-        values = {
+        domain = []
+        if state:
+            domain.append(('state', '=', state))
+        if year:
+            domain += [
+                ('date_start', '>=', '%s-01-01' % year),
+                ('date_start', '<', '%s-01-01' % (year + 1)),
+            ]
+        
+        url_args = {key: value for key, value in (('state', state), ('year', year)) if value}
+        pager = request.website.pager(
+            url='/copas',
+            total=Copa.search_count(domain),
+            page=page,
+            step=COPAS_PER_PAGE,
+            url_args=url_args,
+        )
+        # Los contadores mostrados son campos guardados: se leen en una sola
+        # consulta para toda la página gracias al prefetch
+        copas = Copa.search(domain, limit=COPAS_PER_PAGE, offset=pager['offset'])
+        
+        years = sorted(
+            (date_start.year for date_start, in Copa._read_group(
+                [('date_start', '!=', False)], ['date_start:year'],
+            )),
+            reverse=True,
+        )
+        
+        return {
             'copas': copas,
+            'pager': pager,
+            'years': years,
+            'states': Copa._fields['state'].selection,
+            'current_state': state,
+            'current_year': year,
         }
-        
-        return request.render('beiscool.copas_list_page', values)
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+Núcleo del torneo sin dependencias de Odoo: round-robin, programación de
+horarios, tabla de posiciones y desempates. Trabaja con enteros y tuplas
+(ids de equipos, copas y sedes); los modelos de Odoo son adaptadores que
+leen los registros, llaman a estas funciones y escriben el resultado.
+
+Este paquete no debe importar nada de odoo: los benchmarks lo cargan sin
+un servidor (ver benchmarks/bench_core.py).
+"""
+
+from . import round_robin
+from . import scheduling
+from . import standings
+from . import tiebreak
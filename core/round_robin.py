@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Generación del round-robin (todos contra todos) con el método del círculo.
+
+Un cruce (fixture) es una tupla (jornada, id_local, id_visitante).
+"""
+
+from collections import defaultdict
+
+
+def generate(team_ids, legs=1, canonical=False):
+    """
+    Cruces de un round-robin de `legs` vueltas.
+    
+    canonical=False reproduce el calendario clásico: "bye" al final y las
+    mismas localías en todas las vueltas.
+    canonical=True usa el patrón de mínimos quiebres: el equipo fijo
+    alterna la localía por jornada y los demás cruces según su posición
+    (n - 2 quiebres, el mínimo posible); con un número impar de equipos el
+    "bye" es el equipo fijo, así nadie encadena dos partidos en la misma
+    condición. Las vueltas pares son el espejo de las impares.
+    """
+    teams = list(team_ids)
+    n = len(teams)
+    if n < 2:
+        return []
+    
+    # Si el número de equipos es impar, añadir "bye" (None)
+    if n % 2 == 1:
+        teams = [None] + teams if canonical else teams + [None]
+        n += 1
+    
+    num_rounds = n - 1
+    half = n // 2
+    rounds = []
+    for r in range(num_rounds):
+        # Rotar equipos (excepto el primero)
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+        pairs = []
+        for i in range(half):
+            home = teams[i]
+            away = teams[n - 1 - i]
+            if canonical and (r % 2 if i == 0 else i % 2):
+                home, away = away, home
+            # Ignorar si uno es "bye"
+            if home is not None and away is not None:
+                pairs.append((home, away))
+        rounds.append(pairs)
+    
+    # Repetir según número de vueltas; cada jornada del círculo seguida de
+    # sus repeticiones, como en el calendario original
+    fixtures = []
+    for r, pairs in enumerate(rounds):
+        for leg in range(legs):
+            round_number = r + 1 + leg * num_rounds
+            if canonical and leg % 2:
+                fixtures.extend((round_number, away, home) for home, away in pairs)
+            else:
+                fixtures.extend((round_number, home, away) for home, away in pairs)
+    return fixtures
+
+
+def balance_home_away(fixtures, team_ids):
+    """
+    Balanceo local/visitante en una pasada: invierte un cruce cuando el
+    local ya tiene más de un partido de local por encima de las visitas
+    del visitante.
+    """
+    home_count = dict.fromkeys(team_ids, 0)
+    away_count = dict.fromkeys(team_ids, 0)
+    balanced = []
+    for round_number, home, away in fixtures:
+        # Intercambiar si es necesario para balancear
+        if home_count[home] > away_count[away] + 1:
+            home, away = away, home
+        home_count[home] += 1
+        away_count[away] += 1
+        balanced.append((round_number, home, away))
+    return balanced
+
+
+def team_pair(home_id, away_id):
+    """Par de equipos de un cruce, independiente de la localía"""
+    return (min(home_id, away_id), max(home_id, away_id))
+
+
+def diff_fixtures(target, existing):
+    """
+    Compara los cruces objetivo con los partidos existentes de la copa.
+    Cada par de equipos se compara por vuelta: su n-ésimo cruce objetivo
+    con su n-ésimo partido existente, contando primero los jugados, luego
+    los programados y al final los cancelados, cada grupo en el orden
+    recibido (cronológico).
+    target: cruces (jornada, local, visitante)
+    existing: [(match_id, local, visitante, jugado, fijo), ...], donde fijo
+    marca los partidos que no se pueden eliminar (jugados y cancelados)
+    Retorna (missing, kept, obsolete):
+    - missing: cruces objetivo sin partido existente, en el orden de target
+    - kept: {match_id: cruce objetivo} de los partidos que cubren un cruce
+    - obsolete: match_ids no fijos que no cubren ningún cruce
+    Los partidos fijos sin cruce objetivo no aparecen en ninguna lista:
+    nunca se eliminan.
+    """
+    targets_by_pair = defaultdict(list)
+    for index, fixture in enumerate(target):
+        targets_by_pair[team_pair(fixture[1], fixture[2])].append((index, fixture))
+    
+    existing_by_pair = defaultdict(list)
+    for match in sorted(existing, key=lambda match: (not match[3], match[4])):
+        existing_by_pair[team_pair(match[1], match[2])].append(match)
+    
+    missing = []
+    kept = {}
+    obsolete = []
+    for pair in set(targets_by_pair) | set(existing_by_pair):
+        fixtures = targets_by_pair.get(pair, [])
+        matches = existing_by_pair.get(pair, [])
+        for match, (_index, fixture) in zip(matches, fixtures):
+            kept[match[0]] = fixture
+        missing.extend(fixtures[len(matches):])
+        obsolete.extend(match[0] for match in matches[len(fixtures):] if not match[4])
+    missing.sort()
+    return [fixture for _index, fixture in missing], kept, sorted(obsolete)
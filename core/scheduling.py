@@ -0,0 +1,514 @@
+# -*- coding: utf-8 -*-
+"""
+Programación del calendario: optimización local/visitante, horarios de
+sedes y asignación de fecha, hora y sede a cada cruce.
+
+Un cruce (fixture) es (jornada, id_local, id_visitante); un partido
+programado es (jornada, id_local, id_visitante, inicio, id_sede), con
+inicio como datetime sin zona horaria e id_sede None si no hay sede.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timedelta
+import random
+import time
+
+# Duración por defecto de un partido, en horas
+DEFAULT_GAME_DURATION = 2.5
+
+# Horarios usados cuando la copa no tiene sedes: sábado y domingo
+# a las 9:30 y 12:00, un juego por horario
+DEFAULT_SLOT_TEMPLATES = {
+    5: [(9.5, None, 1), (12.0, None, 1)],
+    6: [(9.5, None, 1), (12.0, None, 1)],
+}
+
+# Pesos del costo por equipo de la optimización local/visitante: un quiebre
+# pesa más que una unidad de desbalance de localía o de horario
+BREAK_WEIGHT = 4
+
+# Iteraciones máximas de búsqueda local por partido del calendario
+ITERATIONS_PER_FIXTURE = 50
+
+
+# ============================================
+# OPTIMIZACIÓN LOCAL/VISITANTE
+# ============================================
+
+def optimize_home_away(fixtures, time_budget=2.0, seed=0):
+    """
+    Búsqueda local acotada por tiempo sobre un calendario (normalmente el
+    canónico de round_robin.generate).
+
+    Movimientos:
+    - invertir la localía de un cruce (en todas sus vueltas a la vez)
+    - intercambiar el orden de dos partidos de una misma jornada; los
+      primeros de la jornada toman los horarios tempranos, por lo que
+      aproxima el horario que le toca a cada equipo
+
+    Costo por equipo: quiebres, desbalance local/visitante al cuadrado y
+    desbalance entre horarios tempranos y tardíos al cuadrado. Se aceptan
+    movimientos que no empeoran el costo. Cada movimiento se evalúa solo
+    sobre los equipos que toca, por lo que 100+ equipos entran en el
+    presupuesto de tiempo.
+
+    Retorna los cruces ordenados por jornada y, dentro de la jornada, por
+    el orden en que deben tomar los horarios.
+    """
+    if not fixtures:
+        return []
+
+    rng = random.Random(seed)
+    deadline = time.monotonic() + max(time_budget, 0.0)
+
+    home = []
+    away = []
+    rounds = defaultdict(list)
+    for index, (round_number, home_id, away_id) in enumerate(fixtures):
+        home.append(home_id)
+        away.append(away_id)
+        rounds[round_number].append(index)
+    round_numbers = sorted(rounds)
+
+    # Partidos de cada equipo en orden y posición de cada partido en esa lista
+    team_matches = defaultdict(list)
+    for round_number in round_numbers:
+        for index in rounds[round_number]:
+            team_matches[home[index]].append(index)
+            team_matches[away[index]].append(index)
+    position = {}
+    for team_id, indexes in team_matches.items():
+        for k, index in enumerate(indexes):
+            position[team_id, index] = k
+
+    # Vueltas de un mismo cruce: se invierten juntas
+    pairs = defaultdict(list)
+    for index in range(len(fixtures)):
+        pairs[frozenset((home[index], away[index]))].append(index)
+    pairs = list(pairs.values())
+
+    # Horario relativo dentro de la jornada: +1 temprano, -1 tarde, 0 al medio
+    label = [0] * len(fixtures)
+    for round_number in round_numbers:
+        indexes = rounds[round_number]
+        size = len(indexes)
+        for slot, index in enumerate(indexes):
+            label[index] = (slot * 2 < size - 1) - (slot * 2 > size - 1)
+
+    def is_home(team_id, k):
+        return home[team_matches[team_id][k]] == team_id
+
+    def count_breaks(team_id, starts):
+        games = len(team_matches[team_id])
+        return sum(
+            1 for k in starts
+            if 0 <= k < games - 1 and is_home(team_id, k) == is_home(team_id, k + 1)
+        )
+
+    breaks = {}
+    homes = {}
+    slot_score = {}
+    for team_id, indexes in team_matches.items():
+        breaks[team_id] = count_breaks(team_id, range(len(indexes)))
+        homes[team_id] = sum(1 for index in indexes if home[index] == team_id)
+        slot_score[team_id] = sum(label[index] for index in indexes)
+
+    def team_cost(team_id):
+        games = len(team_matches[team_id])
+        return (
+            BREAK_WEIGHT * breaks[team_id]
+            + (2 * homes[team_id] - games) ** 2
+            + slot_score[team_id] ** 2
+        )
+
+    def flip_pair(indexes):
+        for index in indexes:
+            home[index], away[index] = away[index], home[index]
+            homes[home[index]] += 1
+            homes[away[index]] -= 1
+
+    swappable = [r for r in round_numbers if len(rounds[r]) > 1]
+    for iteration in range(ITERATIONS_PER_FIXTURE * len(fixtures)):
+        if not iteration % 64 and time.monotonic() > deadline:
+            break
+
+        if swappable and rng.random() < 0.5:
+            # Intercambiar dos partidos de una jornada
+            indexes = rounds[rng.choice(swappable)]
+            i, j = rng.sample(range(len(indexes)), 2)
+            first, second = indexes[i], indexes[j]
+            if label[first] == label[second]:
+                continue
+            affected = {home[first], away[first], home[second], away[second]}
+            old_cost = sum(team_cost(t) for t in affected)
+            delta = label[second] - label[first]
+            for team_id in (home[first], away[first]):
+                slot_score[team_id] += delta
+            for team_id in (home[second], away[second]):
+                slot_score[team_id] -= delta
+            if sum(team_cost(t) for t in affected) <= old_cost:
+                indexes[i], indexes[j] = second, first
+                label[first], label[second] = label[second], label[first]
+            else:
+                for team_id in (home[first], away[first]):
+                    slot_score[team_id] -= delta
+                for team_id in (home[second], away[second]):
+                    slot_score[team_id] += delta
+        else:
+            # Invertir la localía de un cruce
+            indexes = rng.choice(pairs)
+            affected = (home[indexes[0]], away[indexes[0]])
+            starts = {
+                team_id: {
+                    start
+                    for index in indexes
+                    for start in (position[team_id, index] - 1, position[team_id, index])
+                }
+                for team_id in affected
+            }
+            old_cost = sum(team_cost(t) for t in affected)
+            old_breaks = {t: count_breaks(t, starts[t]) for t in affected}
+            flip_pair(indexes)
+            for team_id in affected:
+                breaks[team_id] += count_breaks(team_id, starts[team_id]) - old_breaks[team_id]
+            if sum(team_cost(t) for t in affected) > old_cost:
+                flip_pair(indexes)
+                for team_id in affected:
+                    breaks[team_id] = breaks[team_id] - count_breaks(team_id, starts[team_id]) \
+                        + old_breaks[team_id]
+
+    return [
+        (round_number, home[index], away[index])
+        for round_number in round_numbers
+        for index in rounds[round_number]
+    ]
+
+
+def schedule_metrics(scheduled):
+    """
+    Calidad de un calendario programado: (quiebres local/visitante, mayor
+    desbalance de localía, diferencia en horas entre las horas promedio de
+    juego de los equipos)
+    """
+    sequences = defaultdict(list)
+    hours = defaultdict(list)
+    for _round, home_id, away_id, start, _venue in sorted(scheduled, key=lambda m: (m[3], m[0])):
+        hour = start.hour + start.minute / 60.0
+        sequences[home_id].append(True)
+        sequences[away_id].append(False)
+        hours[home_id].append(hour)
+        hours[away_id].append(hour)
+
+    if not sequences:
+        return 0, 0, 0.0
+
+    averages = [sum(values) / len(values) for values in hours.values()]
+    breaks = sum(
+        sum(1 for previous, current in zip(sequence, sequence[1:]) if previous == current)
+        for sequence in sequences.values()
+    )
+    spread = max(abs(2 * sum(sequence) - len(sequence)) for sequence in sequences.values())
+    return breaks, spread, round(max(averages) - min(averages), 2)
+
+
+# ============================================
+# HORARIOS Y SEDES
+# ============================================
+
+def slot_templates(venues, duration):
+    """
+    Horarios semanales a partir de las sedes.
+    venues: [(venue_id, terrenos, [(día_semana, hora_inicio, hora_fin), ...]), ...]
+    Cada horario de sede se divide en partidos consecutivos de `duration`
+    horas. Retorna {día_semana: [(hora_inicio, venue_id, terrenos), ...]},
+    vacío si ningún partido cabe en los horarios.
+    """
+    templates = defaultdict(list)
+    for venue_id, field_count, windows in venues:
+        for weekday, time_start, time_end in windows:
+            start = time_start
+            while start + duration <= time_end + 1e-6:
+                templates[weekday].append((start, venue_id, field_count))
+                start += duration
+    for slots in templates.values():
+        slots.sort(key=lambda slot: (slot[0], slot[1] or 0))
+    return dict(templates)
+
+
+def iter_schedule_days(start_date, templates, copa_dates=(), venue_dates=None):
+    """
+    Recorre los días desde start_date y genera (fecha, horarios) para los
+    días con horarios disponibles. Cada horario es (datetime, venue_id) y
+    aparece una vez por terreno, ordenado por hora.
+    copa_dates: fechas bloqueadas en todas las sedes
+    venue_dates: {venue_id: fechas bloqueadas de la sede}
+    """
+    venue_dates = venue_dates or {}
+    current_date = start_date
+    while True:
+        day_templates = templates.get(current_date.weekday())
+        if day_templates and current_date not in copa_dates:
+            midnight = datetime.combine(current_date, datetime.min.time())
+            slots = []
+            for start, venue_id, field_count in day_templates:
+                if venue_id and current_date in venue_dates.get(venue_id, ()):
+                    continue
+                slot = (midnight + timedelta(minutes=round(start * 60)), venue_id)
+                slots.extend([slot] * field_count)
+            if slots:
+                yield current_date, slots
+        current_date += timedelta(days=1)
+
+
+def assign_slots(fixtures, days, team_count, occupied=None):
+    """
+    Empaqueta los cruces, en orden de jornada, en los horarios paralelos
+    de `days` (ver iter_schedule_days). Un equipo juega como máximo una vez
+    por día (y por lo tanto una vez por horario). Cada día solo se revisa
+    una ventana acotada de cruces pendientes, por lo que el costo es casi
+    lineal en la cantidad de partidos.
+    occupied: {fecha: (equipos, [(inicio, venue_id), ...])} de partidos ya
+    programados que se respetan (ver occupied_slots).
+    Retorna los partidos programados (jornada, local, visitante, inicio, sede);
+    los elementos de un cruce después del visitante se conservan al final.
+    """
+    pending = deque(sorted(fixtures, key=lambda fixture: fixture[0]))
+    scheduled = []
+    lookahead = max(2 * team_count, 1)
+    occupied = occupied or {}
+
+    for day, slots in days:
+        if not pending:
+            break
+        busy = set()
+        if day in occupied:
+            teams, taken = occupied[day]
+            busy.update(teams)
+            slots = free_slots(slots, taken)
+        size = min(len(pending), max(lookahead, 2 * len(slots)))
+        window = [pending.popleft() for _i in range(size)]
+        remaining = []
+        slot_index = 0
+        for fixture in window:
+            home_id, away_id = fixture[1], fixture[2]
+            if slot_index >= len(slots) or home_id in busy or away_id in busy:
+                remaining.append(fixture)
+                continue
+            busy.add(home_id)
+            busy.add(away_id)
+            scheduled.append(fixture[:3] + slots[slot_index] + fixture[3:])
+            slot_index += 1
+        pending.extendleft(reversed(remaining))
+
+    return scheduled
+
+
+def free_slots(slots, taken):
+    """Horarios del día sin los ya usados (cada uso ocupa un terreno)"""
+    taken = Counter(taken)
+    free = []
+    for slot in slots:
+        if taken[slot]:
+            taken[slot] -= 1
+        else:
+            free.append(slot)
+    return free
+
+
+def occupied_slots(matches, copa_dates=(), venue_dates=None, venue_ids=None):
+    """
+    Separa los partidos que se conservan en su horario de los que deben
+    reprogramarse.
+    matches: [(match_id, local, visitante, inicio, venue_id, fijo), ...] en
+    orden cronológico; un partido fijo (jugado) nunca se mueve.
+    Un partido no fijo se mueve si no tiene fecha, cae en una fecha
+    bloqueada, su sede ya no es de la copa (venue_ids) o uno de sus
+    equipos ya juega ese día.
+    Retorna (occupied, moved): occupied en el formato de assign_slots y
+    moved la lista de match_ids a reprogramar.
+    """
+    venue_dates = venue_dates or {}
+    occupied = {}
+    moved = []
+    for match_id, home_id, away_id, start, venue_id, fixed in sorted(
+            matches, key=lambda match: not match[5]):
+        day = start.date() if start else None
+        if not fixed and (
+            day is None
+            or day in copa_dates
+            or (venue_id and day in venue_dates.get(venue_id, ()))
+            or (venue_ids and venue_id not in venue_ids)
+        ):
+            moved.append(match_id)
+            continue
+        if day is None:
+            continue
+        teams, taken = occupied.setdefault(day, (set(), []))
+        if not fixed and (home_id in teams or away_id in teams):
+            moved.append(match_id)
+            continue
+        teams.update((home_id, away_id))
+        taken.append((start, venue_id or None))
+    return occupied, moved
+
+
+# ============================================
+# REPROGRAMACIÓN
+# ============================================
+
+class OccupancyIndex:
+    """
+    Ocupación en memoria de un calendario para buscar horarios libres sin
+    recorrer los partidos: días de juego por equipo e inicios por árbitro
+    en listas ordenadas (búsqueda binaria, O(log n)) y usos por horario y
+    sede en un contador.
+    Con los días candidatos registrados (set_days), los días con algún
+    terreno libre se guardan en una lista ordenada: la búsqueda salta
+    directo al primer día abierto posterior a una fecha y nunca visita
+    los días completos.
+    Un partido es (match_id, local, visitante, inicio, venue_id, referee_id,
+    copa_id).
+    Un equipo juega a lo sumo una vez por día; un árbitro no puede tener
+    dos partidos a menos de `duration` horas; un horario de sede admite un
+    partido por terreno. Los horarios sin sede son propios de cada copa:
+    un partido sin sede de otra copa (incluido por compartir árbitro) solo
+    ocupa a su árbitro.
+    """
+
+    def __init__(self, matches=(), duration=DEFAULT_GAME_DURATION, copa_id=None):
+        self.duration = timedelta(minutes=round(duration * 60))
+        self.copa_id = copa_id
+        self.team_days = defaultdict(list)
+        self.referee_starts = defaultdict(list)
+        self.slot_uses = Counter()
+        self.matches = {}
+        self.days = []
+        self.day_dates = []
+        self.day_positions = {}
+        self.open_days = []
+        for match in matches:
+            self.add(match)
+
+    def set_days(self, days):
+        """Registra los días candidatos (ver iter_schedule_days), en orden de fecha"""
+        self.days = list(days)
+        self.day_dates = [day for day, _slots in self.days]
+        self.day_positions = {day: position for position, day in enumerate(self.day_dates)}
+        self.open_days = [
+            position for position, (_day, slots) in enumerate(self.days)
+            if self._has_free_field(slots)
+        ]
+
+    def _has_free_field(self, slots):
+        return any(count > self.slot_uses[slot] for slot, count in Counter(slots).items())
+
+    def _refresh_day(self, day):
+        """Actualiza la lista de días abiertos tras ocupar o liberar un horario del día"""
+        position = self.day_positions.get(day)
+        if position is None:
+            return
+        index = bisect_left(self.open_days, position)
+        is_open = index < len(self.open_days) and self.open_days[index] == position
+        if self._has_free_field(self.days[position][1]):
+            if not is_open:
+                self.open_days.insert(index, position)
+        elif is_open:
+            del self.open_days[index]
+
+    def _uses_slot(self, venue_id, copa_id):
+        """Si el partido ocupa un terreno de los horarios de la copa del índice"""
+        return bool(venue_id) or copa_id == self.copa_id
+
+    def add(self, match):
+        match_id, home_id, away_id, start, venue_id, referee_id, copa_id = match
+        if not start:
+            return
+        self.matches[match_id] = match
+        for team_id in (home_id, away_id):
+            insort(self.team_days[team_id], start.date())
+        if referee_id:
+            insort(self.referee_starts[referee_id], start)
+        if self._uses_slot(venue_id, copa_id):
+            self.slot_uses[start, venue_id or None] += 1
+            self._refresh_day(start.date())
+
+    def remove(self, match_id):
+        match = self.matches.pop(match_id, None)
+        if not match:
+            return
+        _match_id, home_id, away_id, start, venue_id, referee_id, copa_id = match
+        for team_id in (home_id, away_id):
+            _remove_sorted(self.team_days[team_id], start.date())
+        if referee_id:
+            _remove_sorted(self.referee_starts[referee_id], start)
+        if self._uses_slot(venue_id, copa_id):
+            self.slot_uses[start, venue_id or None] -= 1
+            self._refresh_day(start.date())
+
+    def team_busy(self, team_id, day):
+        days = self.team_days.get(team_id)
+        if not days:
+            return False
+        index = bisect_left(days, day)
+        return index < len(days) and days[index] == day
+
+    def referee_busy(self, referee_id, start):
+        starts = self.referee_starts.get(referee_id)
+        if not starts:
+            return False
+        index = bisect_right(starts, start - self.duration)
+        return index < len(starts) and starts[index] < start + self.duration
+
+    def find_slot(self, home_id, away_id, referee_id, after=None):
+        """
+        Primer horario libre de los días registrados (ver set_days)
+        posterior a after para un partido: (inicio, venue_id), o None si no
+        hay. Solo recorre días abiertos: cada día descartado es un día en
+        que juega uno de los equipos o en que el árbitro está ocupado.
+        """
+        first = bisect_left(self.day_dates, after.date()) if after else 0
+        for index in range(bisect_left(self.open_days, first), len(self.open_days)):
+            day, slots = self.days[self.open_days[index]]
+            if self.team_busy(home_id, day) or self.team_busy(away_id, day):
+                continue
+            fields_seen = Counter()
+            for slot in slots:
+                # Cada repetición del horario es un terreno; los primeros están usados
+                fields_seen[slot] += 1
+                if fields_seen[slot] <= self.slot_uses[slot]:
+                    continue
+                if after and slot[0] < after:
+                    continue
+                if referee_id and self.referee_busy(referee_id, slot[0]):
+                    continue
+                return slot
+        return None
+
+
+def _remove_sorted(values, value):
+    index = bisect_left(values, value)
+    if index < len(values) and values[index] == value:
+        del values[index]
+
+
+def reschedule(index, matches, days, after=None):
+    """
+    Reprograma partidos en el primer horario libre posterior a after.
+    Todos los partidos se quitan del índice antes de empezar (sus horarios
+    actuales quedan libres) y se ubican en orden, cada uno ocupando su
+    nuevo horario en el índice.
+    matches: [(match_id, local, visitante, referee_id), ...]
+    days: lista de días (ver iter_schedule_days), registrada en el índice
+    Retorna {match_id: (inicio, venue_id) o None si no hay horario libre}
+    """
+    for match in matches:
+        index.remove(match[0])
+    index.set_days(days)
+    result = {}
+    for match_id, home_id, away_id, referee_id in matches:
+        slot = index.find_slot(home_id, away_id, referee_id, after)
+        result[match_id] = slot
+        if slot:
+            index.add((match_id, home_id, away_id, slot[0], slot[1], referee_id, index.copa_id))
+    return result
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Contadores de la tabla de posiciones y de las estadísticas de equipos.
+
+Un partido jugado es (copa_id, id_local, id_visitante, carreras_local,
+carreras_visitante). Los aportes son {clave: {contador: valor}}; en la
+tabla la clave es (copa_id, team_id) y los contadores incluyen las
+claves ('head_to_head', id_rival, contador) de la matriz de encuentros
+directos.
+"""
+
+from collections import defaultdict
+
+# Contadores acumulables de la tabla de posiciones
+STANDINGS_COUNTERS = (
+    'matches_played',
+    'matches_won',
+    'matches_lost',
+    'runs_scored',
+    'runs_allowed',
+)
+
+# Contadores de la matriz de encuentros directos, en el orden en que se
+# guardan en head_to_head: {id_rival: [jugados, ganados, anotadas, permitidas]}.
+# En los aportes y diferencias se identifican con la clave
+# ('head_to_head', id_rival, contador).
+HEAD_TO_HEAD_COUNTERS = (
+    'matches_played',
+    'matches_won',
+    'runs_scored',
+    'runs_allowed',
+)
+
+# Posición de cada contador en una fila de la matriz
+HEAD_TO_HEAD_INDEX = {name: index for index, name in enumerate(HEAD_TO_HEAD_COUNTERS)}
+
+# Puntos por victoria (0 por derrota)
+POINTS_PER_WIN = 3
+
+
+def standings_contributions(played_matches):
+    """
+    Aporte de partidos jugados de round-robin a la tabla de posiciones.
+    Retorna: {(copa_id, team_id): {contador: valor}}
+    """
+    contributions = defaultdict(lambda: defaultdict(int))
+    for copa_id, home_id, away_id, home_runs, away_runs in played_matches:
+        home_runs = home_runs or 0
+        away_runs = away_runs or 0
+        sides = (
+            (home_id, away_id, home_runs, away_runs),
+            (away_id, home_id, away_runs, home_runs),
+        )
+        for team_id, opponent_id, scored, allowed in sides:
+            entry = contributions[(copa_id, team_id)]
+            won = int(scored > allowed)
+            entry['matches_played'] += 1
+            # Un empate cuenta como derrota, igual que en la reconstrucción completa
+            entry['matches_won'] += won
+            entry['matches_lost'] += 1 - won
+            entry['runs_scored'] += scored
+            entry['runs_allowed'] += allowed
+            entry[('head_to_head', opponent_id, 'matches_played')] += 1
+            entry[('head_to_head', opponent_id, 'matches_won')] += won
+            entry[('head_to_head', opponent_id, 'runs_scored')] += scored
+            entry[('head_to_head', opponent_id, 'runs_allowed')] += allowed
+    return contributions
+
+
+def team_contributions(played_matches):
+    """
+    Aporte de partidos jugados (todas las etapas) a las estadísticas de
+    cada equipo. Retorna: {team_id: {contador: valor}}
+    """
+    contributions = defaultdict(lambda: defaultdict(int))
+    for _copa_id, home_id, away_id, home_runs, away_runs in played_matches:
+        home_runs = home_runs or 0
+        away_runs = away_runs or 0
+        for team_id, scored, allowed in ((home_id, home_runs, away_runs), (away_id, away_runs, home_runs)):
+            entry = contributions[team_id]
+            won = int(scored > allowed)
+            entry['matches_played'] += 1
+            entry['matches_won'] += won
+            entry['matches_lost'] += 1 - won
+            entry['runs_scored'] += scored
+            entry['runs_allowed'] += allowed
+    return contributions
+
+
+def fold_totals(rows):
+    """
+    Totales de la tabla a partir de filas agregadas por equipo y rival:
+    (copa_id, team_id, id_rival, jugados, ganados, anotadas, permitidas).
+    Retorna el mismo formato que standings_contributions.
+    """
+    totals = defaultdict(lambda: defaultdict(int))
+    for copa_id, team_id, opponent_id, played, won, scored, allowed in rows:
+        entry = totals[(copa_id, team_id)]
+        entry['matches_played'] += played
+        entry['matches_won'] += won
+        # Un empate cuenta como derrota
+        entry['matches_lost'] += played - won
+        entry['runs_scored'] += scored
+        entry['runs_allowed'] += allowed
+        entry[('head_to_head', opponent_id, 'matches_played')] += played
+        entry[('head_to_head', opponent_id, 'matches_won')] += won
+        entry[('head_to_head', opponent_id, 'runs_scored')] += scored
+        entry[('head_to_head', opponent_id, 'runs_allowed')] += allowed
+    return totals
+
+
+def diff(old, new):
+    """Diferencia (nuevo - anterior) entre dos aportes"""
+    delta = defaultdict(lambda: defaultdict(int))
+    for key, values in new.items():
+        for name, value in values.items():
+            delta[key][name] += value
+    for key, values in old.items():
+        for name, value in values.items():
+            delta[key][name] -= value
+    return delta
+
+
+def counters_values(counters):
+    """Valores de una fila a partir de los contadores, con los campos derivados"""
+    values = {name: counters.get(name, 0) for name in STANDINGS_COUNTERS}
+    values['run_differential'] = values['runs_scored'] - values['runs_allowed']
+    values['points'] = values['matches_won'] * POINTS_PER_WIN
+    return values
+
+
+def merge_head_to_head(head_to_head, values):
+    """
+    Suma a una fila de la matriz ({str(id_rival): [contadores]}) los
+    contadores ('head_to_head', rival, contador) de values. Quita los
+    rivales sin partidos (p. ej. tras revertir un resultado).
+    """
+    size = len(HEAD_TO_HEAD_COUNTERS)
+    result = {
+        opponent: list(counters)
+        for opponent, counters in (head_to_head or {}).items()
+    }
+    for key, value in values.items():
+        if not isinstance(key, tuple) or not value:
+            continue
+        _name, opponent_id, name = key
+        counters = result.setdefault(str(opponent_id), [0] * size)
+        counters[HEAD_TO_HEAD_INDEX[name]] += value
+    return {
+        opponent: counters for opponent, counters in result.items()
+        if counters[0]
+    }
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Orden de la tabla de posiciones y desempates por encuentros directos.
+
+Una fila es (row_id, team_id, ganados, diferencia, anotadas, head_to_head),
+con head_to_head la fila de la matriz de encuentros directos
+{str(id_rival): [jugados, ganados, anotadas, permitidas]}.
+"""
+
+from collections import defaultdict
+
+from .standings import HEAD_TO_HEAD_COUNTERS
+
+ROW_ID, TEAM_ID, WON, RUN_DIFFERENTIAL, RUNS_SCORED, HEAD_TO_HEAD = range(6)
+
+
+def head_to_head_counters(head_to_head, other_team_id):
+    """Contadores del encuentro directo contra otro equipo (lectura de la matriz)"""
+    counters = (head_to_head or {}).get(str(other_team_id))
+    return dict(zip(HEAD_TO_HEAD_COUNTERS, counters or [0] * len(HEAD_TO_HEAD_COUNTERS)))
+
+
+def mini_table_key(team_id, head_to_head, team_ids):
+    """
+    Criterios de la mini-tabla formada solo por los partidos contra
+    team_ids: victorias y diferencia de carreras entre los empatados.
+    """
+    won = run_differential = 0
+    for other_team_id in team_ids:
+        if other_team_id == team_id:
+            continue
+        counters = (head_to_head or {}).get(str(other_team_id))
+        if counters:
+            won += counters[1]
+            run_differential += counters[2] - counters[3]
+    return (won, run_differential)
+
+
+def resolve_tie(rows):
+    """
+    Ordena un grupo de filas empatadas en victorias:
+    1. Mini-tabla de los partidos entre los empatados (victorias, diferencia)
+    2. Diferencia de carreras general
+    3. Carreras anotadas
+    Si la mini-tabla separa el grupo en subgrupos, cada subgrupo todavía
+    empatado se resuelve de nuevo con una mini-tabla propia.
+    Retorna una lista de grupos; cada grupo es un empate exacto.
+    """
+    if len(rows) < 2:
+        return [list(rows)] if rows else []
+
+    team_ids = [row[TEAM_ID] for row in rows]
+    keyed = sorted(
+        (
+            (mini_table_key(row[TEAM_ID], row[HEAD_TO_HEAD], team_ids)
+             + (row[RUN_DIFFERENTIAL], row[RUNS_SCORED]), row)
+            for row in rows
+        ),
+        key=lambda item: item[0],
+        reverse=True,
+    )
+
+    groups = []
+    for key, row in keyed:
+        if groups and groups[-1][0] == key:
+            groups[-1][1].append(row)
+        else:
+            groups.append((key, [row]))
+
+    if len(groups) == 1:
+        # Nada separa a estos equipos: empate exacto
+        return [list(rows)]
+
+    result = []
+    for _key, group in groups:
+        result.extend(resolve_tie(group))
+    return result
+
+
+def rank(rows):
+    """
+    Ordena las filas de una copa por victorias y resuelve los empates con
+    la matriz de encuentros directos (ver resolve_tie).
+    Retorna una lista de grupos en orden; cada grupo comparte posición.
+    """
+    by_wins = defaultdict(list)
+    for row in rows:
+        by_wins[row[WON]].append(row)
+
+    ranked = []
+    for won in sorted(by_wins, reverse=True):
+        ranked.extend(resolve_tie(by_wins[won]))
+    return ranked
+
+
+def positions(rows):
+    """
+    Posición de cada fila: {row_id: posición}. Los empates exactos
+    comparten posición (1, 2, 2, 4).
+    """
+    result = {}
+    position = 1
+    for tied in rank(rows):
+        for row in tied:
+            result[row[ROW_ID]] = position
+        position += len(tied)
+    return result
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """
+    - Reconstruye la tabla de posiciones de todas las copas: las filas
+      existentes no tienen la matriz de encuentros directos (head_to_head)
+      que usan los desempates.
+    - Recalcula las estadísticas de todos los equipos: dejaron de ser
+      campos calculados y sus columnas nuevas empiezan en 0.
+    """
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['beiscool.copa'].with_context(active_test=False).search([])._compute_standings()
+    # También los equipos sin copa, que la reconstrucción no recorre
+    env['beiscool.team'].with_context(active_test=False).search([])._recompute_match_counters()
+    env.flush_all()
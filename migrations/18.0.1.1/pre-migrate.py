@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """
+    Elimina las filas repetidas (copa, equipo) de la tabla de posiciones
+    antes de que se agregue la restricción copa_team_uniq. Se conserva la
+    fila más antigua: la tabla se reconstruye en el post-migrate.
+    """
+    if not version:
+        return
+    cr.execute("""
+        DELETE FROM beiscool_standings AS duplicate
+              USING beiscool_standings AS kept
+              WHERE duplicate.copa_id = kept.copa_id
+                AND duplicate.team_id = kept.team_id
+                AND duplicate.id > kept.id
+    """)
+    if cr.rowcount:
+        _logger.info('Tabla de posiciones: %s filas repetidas eliminadas', cr.rowcount)
@@ -1,5 +1,10 @@
 # -*- coding: utf-8 -*-
 
+from . import beiscool_image_mixin
+from . import beiscool_partner_mixin
+from . import beiscool_perf_sample
+from . import beiscool_job
+from . import beiscool_venue
 from . import beiscool_copa
 from . import beiscool_player
 from . import beiscool_team
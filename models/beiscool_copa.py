@@ -1,9 +1,71 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+from odoo import models, fields, api, Command
+from odoo.addons.base.models.res_partner import _tz_get
 from odoo.exceptions import UserError, ValidationError
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+import base64
+import itertools
+import json
+import logging
 import math
+import random
+import struct
+import time
+import zlib
+
+from ..core import round_robin, scheduling
+from ..core import standings as standings_core
+from .beiscool_job import JOB_CHUNK_SIZE
+from .beiscool_perf_sample import BeiscoolPerfProbe
+
+_logger = logging.getLogger(__name__)
+
+# Campos de la copa que se reflejan en los eventos de calendario de sus partidos
+CALENDAR_COPA_FIELDS = {'name', 'location', 'game_duration', 'tz'}
+
+# Secuencia con la versión global del listado público de copas
+LIST_VERSION_SEQUENCE = 'beiscool_copa_list_version_seq'
+
+# Avance (%) de un trabajo de calendario al terminar de eliminar los
+# partidos y rango que ocupa la creación de los nuevos
+JOB_PROGRESS_UNLINK = 10.0
+JOB_PROGRESS_CREATE = (20.0, 90.0)
+
+# Días después de la fecha pedida en los que se busca un horario libre
+RESCHEDULE_HORIZON_DAYS = 180
+
+# Partidos por create en la generación de datos sintéticos
+SYNTHETIC_MATCH_BATCH = 10000
+
+# Nombres combinados para los datos sintéticos
+SYNTHETIC_FIRST_NAMES = (
+    'Carlos', 'Miguel', 'José', 'Luis', 'Pedro', 'Juan', 'Roberto', 'Andrés',
+    'Javier', 'Alejandro', 'Fernando', 'Ricardo', 'Eduardo', 'Manuel', 'Raúl',
+)
+SYNTHETIC_LAST_NAMES = (
+    'Rodríguez', 'Hernández', 'Martínez', 'González', 'Pérez', 'Sánchez',
+    'Ramírez', 'Torres', 'Flores', 'Rivera', 'Gómez', 'Díaz', 'Cruz', 'Morales',
+)
+SYNTHETIC_TEAM_NAMES = (
+    'Tigres', 'Leones', 'Águilas', 'Toros', 'Piratas', 'Industriales',
+    'Cocodrilos', 'Alazanes', 'Huracanes', 'Vegueros', 'Naranjas', 'Azucareros',
+)
+
+
+def _synthetic_png(rgb, size=16):
+    """PNG de un solo color armado a mano (sin PIL), para imágenes de prueba"""
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data \
+            + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+    row = b'\x00' + bytes(rgb) * size
+    return b''.join((
+        b'\x89PNG\r\n\x1a\n',
+        chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 2, 0, 0, 0)),
+        chunk(b'IDAT', zlib.compress(row * size)),
+        chunk(b'IEND', b''),
+    ))
 
 
 class BeiscoolCopa(models.Model):
@@ -52,20 +114,20 @@ class BeiscoolCopa(models.Model):
     team_quantity = fields.Integer(
         string='Cantidad de Equipos',
         compute='_compute_team_quantity',
-        store=False,
+        store=True,
     )
 
     player_quantity = fields.Integer(
         string='Cantidad de Jugadores',
         default=0,
-        compute='_compute_player_quantity',
+        compute='_compute_roster_counters',
         store=True,
     )
 
     captain_count = fields.Integer(
         string='Cantidad de Capitanes',
         default=0,
-        compute='_compute_captain_count',
+        compute='_compute_roster_counters',
         store=True,
     )
 
@@ -118,6 +180,71 @@ class BeiscoolCopa(models.Model):
         default=True,
     )
 
+    # Configuración de sedes y horarios para el calendario
+    venue_ids = fields.Many2many(
+        'beiscool.venue',
+        'beiscool_copa_venue_rel',
+        'copa_id',
+        'venue_id',
+        string='Sedes',
+        help='Sin sedes, los partidos se programan sábados y domingos a las 9:30 y 12:00',
+    )
+
+    game_duration = fields.Float(
+        string='Duración del Partido',
+        default=scheduling.DEFAULT_GAME_DURATION,
+        help='Horas reservadas para cada partido dentro de los horarios de las sedes',
+    )
+
+    tz = fields.Selection(
+        _tz_get,
+        string='Zona Horaria',
+        default=lambda self: self.env.user.tz or 'UTC',
+        help='Los horarios de los partidos se guardan como hora local de esta zona; '
+             'los eventos de calendario se convierten a UTC con ella',
+    )
+
+    blackout_ids = fields.One2many(
+        'beiscool.venue.blackout',
+        'copa_id',
+        string='Fechas Bloqueadas',
+    )
+
+    # Optimización del calendario y métricas de calidad del último generado
+    optimize_schedule = fields.Boolean(
+        string='Optimizar Local/Visitante',
+        default=False,
+        help='Genera el calendario con el patrón de mínimos quiebres local/visitante '
+             'y lo mejora con una búsqueda local que también reparte los horarios',
+    )
+
+    schedule_time_budget = fields.Float(
+        string='Tiempo de Optimización (s)',
+        default=2.0,
+        help='Tiempo máximo, en segundos, de la búsqueda local',
+    )
+
+    schedule_breaks = fields.Integer(
+        string='Quiebres Local/Visitante',
+        readonly=True,
+        copy=False,
+        help='Veces que un equipo juega dos partidos seguidos como local o como visitante',
+    )
+
+    schedule_home_away_spread = fields.Integer(
+        string='Desbalance Local/Visitante',
+        readonly=True,
+        copy=False,
+        help='Mayor diferencia entre partidos como local y como visitante de un equipo',
+    )
+
+    schedule_time_spread = fields.Float(
+        string='Diferencia de Horario',
+        readonly=True,
+        copy=False,
+        help='Horas entre la hora promedio de juego más temprana y la más tardía de los equipos',
+    )
+
     team_ids = fields.One2many(
         'beiscool.team',
         'copa_id',
@@ -155,6 +282,63 @@ class BeiscoolCopa(models.Model):
         readonly=True,
     )
 
+    # Versión de la página pública (caché de render y ETag)
+    public_version = fields.Integer(
+        string='Versión Pública',
+        default=0,
+        readonly=True,
+        copy=False,
+    )
+
+    public_write_date = fields.Datetime(
+        string='Última Modificación Pública',
+        readonly=True,
+        copy=False,
+        index=True,
+    )
+
+    calendar_sync = fields.Boolean(
+        string='Sincronizar con Calendario',
+        default=True,
+        help='Crea y actualiza eventos del calendario de Odoo para los partidos, '
+             'con los capitanes y el árbitro como asistentes',
+    )
+
+    # Trabajos en segundo plano (generación de calendario, reconstrucción de tabla)
+    job_ids = fields.One2many(
+        'beiscool.job',
+        'copa_id',
+        string='Trabajos',
+    )
+
+    job_id = fields.Many2one(
+        'beiscool.job',
+        string='Último Trabajo',
+        compute='_compute_job_state',
+    )
+
+    job_state = fields.Selection([
+        ('pending', 'Pendiente'),
+        ('running', 'En Ejecución'),
+        ('done', 'Terminado'),
+        ('failed', 'Fallido'),
+    ], string='Estado del Trabajo', compute='_compute_job_state')
+
+    job_progress = fields.Float(
+        string='Progreso',
+        compute='_compute_job_state',
+    )
+
+    job_progress_message = fields.Char(
+        string='Etapa',
+        compute='_compute_job_state',
+    )
+
+    job_error = fields.Text(
+        string='Error del Trabajo',
+        compute='_compute_job_state',
+    )
+
     # ============================================
     # METODOS COMPUTADOS
     # ============================================
@@ -164,21 +348,37 @@ class BeiscoolCopa(models.Model):
         for record in self:
             record.team_quantity = len(record.team_ids)
 
-    @api.depends('team_ids.player_ids')
-    def _compute_player_quantity(self):
-        for record in self:
-            total_players = 0
-            for team in record.team_ids:
-                total_players += len(team.player_ids)
-            record.player_quantity = total_players
-
-    @api.depends('team_ids.player_ids.is_captain')
-    def _compute_captain_count(self):
+    @api.depends('team_ids.player_ids', 'team_ids.player_ids.is_captain')
+    def _compute_roster_counters(self):
+        """
+        Jugadores y capitanes por copa con un solo conteo agrupado sobre
+        beiscool_team_player_rel. Las dependencias solo marcan las copas
+        de los equipos afectados; todas se recalculan en la misma consulta.
+        """
+        counters = {}
+        copa_ids = [copa_id for copa_id in self.ids if copa_id]
+        if copa_ids:
+            self.env['beiscool.team'].flush_model(['copa_id', 'player_ids'])
+            self.env['beiscool.player'].flush_model(['is_captain'])
+            self.env.cr.execute("""
+                SELECT team.copa_id,
+                       COUNT(rel.player_id),
+                       COUNT(rel.player_id) FILTER (WHERE player.is_captain)
+                  FROM beiscool_team team
+                  JOIN beiscool_team_player_rel rel ON rel.team_id = team.id
+                  JOIN beiscool_player player ON player.id = rel.player_id
+                 WHERE team.copa_id IN %s
+              GROUP BY team.copa_id
+            """, [tuple(copa_ids)])
+            counters = {
+                copa_id: (players, captains)
+                for copa_id, players, captains in self.env.cr.fetchall()
+            }
+        
         for record in self:
-            total_captains = 0
-            for team in record.team_ids:
-                total_captains += len(team.player_ids.filtered(lambda p: p.is_captain))
-            record.captain_count = total_captains
+            players, captains = counters.get(record.id, (0, 0))
+            record.player_quantity = players
+            record.captain_count = captains
 
     @api.depends('match_ids')
     def _compute_match_count(self):
@@ -197,6 +397,99 @@ class BeiscoolCopa(models.Model):
             record.matches_played = len(matches)
             record.matches_total = len(record.match_ids)
 
+    # ============================================
+    # VERSIÓN DE LA PÁGINA PÚBLICA
+    # ============================================
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(BeiscoolCopa, self).create(vals_list)
+        records._bump_public_version()
+        return records
+
+    def write(self, vals):
+        result = super(BeiscoolCopa, self).write(vals)
+        self._bump_public_version()
+        if CALENDAR_COPA_FIELDS.intersection(vals):
+            # Cambian el título, el lugar o el horario de los eventos de sus partidos
+            self.match_ids._mark_calendar_sync_needed()
+        return result
+
+    def unlink(self):
+        # El listado de copas cambia aunque la fila ya no exista
+        self._bump_public_version()
+        return super(BeiscoolCopa, self).unlink()
+
+    def init(self):
+        # Versión global del listado público de copas (ver _read_list_version)
+        self._cr.execute("CREATE SEQUENCE IF NOT EXISTS %s" % LIST_VERSION_SEQUENCE)
+
+    def _bump_public_version(self):
+        """
+        Marca la página pública de las copas como modificada. Las copas se
+        acumulan y la versión se incrementa una sola vez por transacción.
+        La versión del listado avanza antes del commit y otra vez después:
+        un lector que la vio avanzar antes de que los datos fueran visibles
+        no deja una versión vigente con datos viejos.
+        """
+        if not self.ids:
+            return
+        data = self.env.cr.precommit.data
+        pending = data.get('beiscool.copa.public_version')
+        if pending is None:
+            pending = data['beiscool.copa.public_version'] = set()
+            self.env.cr.precommit.add(self.sudo()._flush_public_version)
+            self.env.cr.postcommit.add(self.sudo()._bump_list_version)
+        pending.update(self.ids)
+
+    @api.model
+    def _read_public_version(self, copa_id):
+        """
+        (versión, fecha) de la página pública de una copa con una sola
+        consulta, sin cargar el registro. None si la copa no existe.
+        """
+        self.env.cr.execute("""
+            SELECT public_version, public_write_date
+              FROM beiscool_copa
+             WHERE id = %s
+        """, [copa_id])
+        return self.env.cr.fetchone()
+
+    @api.model
+    def _read_list_version(self):
+        """
+        (versión, fecha) del listado de copas: la versión es el último valor
+        de la secuencia global, que avanza cuando se crea, modifica o
+        elimina cualquier copa. MAX usa el índice de public_write_date; no
+        se recorre la tabla.
+        """
+        self.env.cr.execute("""
+            SELECT (SELECT last_value FROM {sequence}),
+                   (SELECT MAX(public_write_date) FROM beiscool_copa)
+        """.format(sequence=LIST_VERSION_SEQUENCE))
+        return self.env.cr.fetchone()
+
+    @api.model
+    def _bump_list_version(self):
+        self.env.cr.execute("SELECT nextval('%s')" % LIST_VERSION_SEQUENCE)
+
+    @api.model
+    def _flush_public_version(self):
+        """Incrementa la versión pública de las copas marcadas en la transacción"""
+        copa_ids = self.env.cr.precommit.data.pop('beiscool.copa.public_version', None)
+        if not copa_ids:
+            return
+        # SQL directo: no debe disparar write() ni recálculos de la copa.
+        # clock_timestamp(): hora del commit, no la del inicio de la transacción
+        self.env.cr.execute("""
+            UPDATE beiscool_copa
+               SET public_version = public_version + 1,
+                   public_write_date = (clock_timestamp() at time zone 'UTC')
+             WHERE id IN %s
+        """, [tuple(copa_ids)])
+        self.invalidate_model(['public_version', 'public_write_date'])
+        self._bump_list_version()
+
     # ============================================
     # ACCIONES DEL MENÚ
     # ============================================
@@ -215,6 +508,9 @@ class BeiscoolCopa(models.Model):
 
     def action_finished(self):
         """Cambiar estado a finalizado"""
+        # Aplicar los cambios pendientes de la tabla antes de leerla
+        self.env['beiscool.standings']._flush_pending_standings()
+        
         # Determinar campeón
         if self.standings_ids:
             champion = self.standings_ids[0].team_id
@@ -230,28 +526,74 @@ class BeiscoolCopa(models.Model):
     # ============================================
 
     def action_generate_calendar(self):
-        """Genera el calendario completo de la copa"""
+        """Genera el calendario completo de la copa en la transacción actual"""
         self.ensure_one()
+        self._check_generate_calendar()
+        
+        with BeiscoolPerfProbe(self.env, 'action_generate_calendar', copa_id=self.id) as probe:
+            self._generate_calendar(probe)
         
+        return True
+
+    def action_queue_generate_calendar(self):
+        """Encola la generación del calendario en un trabajo en segundo plano"""
+        for copa in self:
+            copa._check_generate_calendar()
+        self.env['beiscool.job']._enqueue(self, 'generate_calendar')
+        return self._notify_job_queued('Generación del calendario en cola.')
+
+    def action_queue_rebuild_standings(self):
+        """Encola la reconstrucción completa de la tabla de posiciones"""
+        self.env['beiscool.job']._enqueue(self, 'rebuild_standings')
+        return self._notify_job_queued('Reconstrucción de la tabla en cola.')
+
+    def _notify_job_queued(self, message):
+        """Aviso de trabajo encolado; recarga la vista para mostrar el progreso"""
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': message,
+                'type': 'info',
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            },
+        }
+
+    def _check_generate_calendar(self):
         if self.state != 'draft':
             raise UserError('Solo puede generar el calendario en estado Borrador.')
         
         if len(self.team_ids) < 2:
             raise UserError('Debe agregar al menos 2 equipos.')
-        
+
+    def _generate_calendar(self, probe, job=None):
+        """
+        Elimina los partidos existentes, genera y programa los cruces y crea
+        los partidos. Con job (trabajo en segundo plano) elimina y crea por
+        lotes, con un commit y un avance por lote.
+        """
         # Eliminar partidos existentes
-        self.match_ids.unlink()
+        if job:
+            self._unlink_matches_by_chunks(job)
+        else:
+            self.match_ids.unlink()
         
         teams = self.team_ids.sorted('name')
         
-        # Generar round-robin
-        round_robin_matches = self._generate_round_robin(teams)
-        
-        # Balancear calendario
-        balanced_matches = self._balance_schedule(round_robin_matches)
+        with probe.phase('compute'):
+            # Generar round-robin
+            fixtures = self._generate_round_robin(teams)
+            
+            # Optimización opcional de quiebres local/visitante y horarios
+            if self.optimize_schedule:
+                fixtures = self._optimize_schedule(fixtures)
+            
+            # Balancear calendario
+            scheduled = self._balance_schedule(fixtures)
         
         # Crear partidos
-        self._create_matches(balanced_matches, 'round_robin')
+        self._create_matches(scheduled, 'round_robin', job=job)
+        self.write(self._get_schedule_metrics(scheduled))
         
         # Generar semifinal si aplica
         if self.has_semifinal:
@@ -261,173 +603,404 @@ class BeiscoolCopa(models.Model):
         if self.has_final:
             self._generate_final()
         
-        # Actualizar tabla de posiciones
-        self._compute_standings()
-        
-        return True
+        # Actualizar tabla de posiciones (una vez, al final de la transacción)
+        self._mark_standings_dirty()
 
-    def _generate_round_robin(self, teams):
+    # ============================================
+    # REGENERACIÓN POR DIFERENCIA
+    # ============================================
+
+    def action_regenerate_calendar(self):
         """
-        Algoritmo round-robin cíclico (todos contra todos)
+        Actualiza el calendario en la transacción actual aplicando solo la
+        diferencia con el calendario objetivo (ver _regenerate_calendar)
         """
-        matches = []
-        n = len(teams)
+        self.ensure_one()
+        self._check_regenerate_calendar()
         
-        # Si el número de equipos es impar, añadir "bye"
-        if n % 2 == 1:
-            teams = teams + [False]  # False representa "bye"
-            n += 1
+        with BeiscoolPerfProbe(self.env, 'action_regenerate_calendar', copa_id=self.id) as probe:
+            stats = self._regenerate_calendar(probe)
         
-        # Número de rondas
-        num_rounds = n - 1
+        return self._notify_calendar_diff(stats)
+
+    def action_queue_regenerate_calendar(self):
+        """Encola la actualización del calendario en un trabajo en segundo plano"""
+        for copa in self:
+            copa._check_regenerate_calendar()
+        self.env['beiscool.job']._enqueue(self, 'regenerate_calendar')
+        return self._notify_job_queued('Actualización del calendario en cola.')
+
+    def _check_regenerate_calendar(self):
+        if self.state not in ('draft', 'in_progress'):
+            raise UserError('Solo puede actualizar el calendario de una copa en Borrador o En Progreso.')
         
-        # Crear lista de equipos para rotar
-        team_list = list(teams)
+        if len(self.team_ids) < 2:
+            raise UserError('Debe agregar al menos 2 equipos.')
+
+    def _notify_calendar_diff(self, stats):
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': 'Calendario actualizado: %(created)s nuevos, %(moved)s reprogramados, '
+                           '%(deleted)s eliminados, %(kept)s sin cambios.' % stats,
+                'type': 'success',
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            },
+        }
+
+    def _regenerate_calendar(self, probe, job=None):
+        """
+        Calcula el round-robin objetivo y aplica solo la diferencia con los
+        partidos existentes (ver core.round_robin.diff_fixtures):
+        - crea los cruces que faltan en los horarios libres
+        - elimina los partidos no jugados que ya no corresponden
+        - reprograma los partidos no jugados cuyo horario dejó de ser válido
+          (sin fecha, fecha bloqueada, sede fuera de la copa o equipo con
+          dos partidos el mismo día)
+        Los partidos jugados y cancelados no se tocan; los conservados
+        mantienen localía, secuencia, ediciones manuales y evento de
+        calendario. Semifinal y final no se modifican.
+        Retorna la cantidad de partidos creados, reprogramados, eliminados
+        y sin cambios.
+        """
+        Match = self.env['beiscool.match']
+        existing = Match.search_read(
+            [('copa_id', '=', self.id), ('stage', '=', 'round_robin')],
+            ['home_team_id', 'away_team_id', 'state', 'match_date', 'venue_id'],
+            order='match_date, sequence, id',
+            load=None,
+        )
+        teams = self.team_ids.sorted('name')
         
-        for r in range(num_rounds):
-            # Rotar equipos (excepto el primero)
-            team_list = [team_list[0]] + [team_list[-1]] + team_list[1:-1]
+        with probe.phase('compute'):
+            fixtures = self._generate_round_robin(teams)
+            if self.optimize_schedule:
+                fixtures = self._optimize_schedule(fixtures)
+            else:
+                fixtures = round_robin.balance_home_away(fixtures, teams.ids)
+            
+            missing, kept, obsolete = round_robin.diff_fixtures(fixtures, [
+                (match['id'], match['home_team_id'], match['away_team_id'],
+                 match['state'] == 'played', match['state'] in ('played', 'cancelled'))
+                for match in existing
+            ])
             
-            # Emparejar equipos de esta ronda
-            round_matches = []
-            for i in range(n // 2):
-                home = team_list[i]
-                away = team_list[n - 1 - i]
-                
-                # Ignorar si uno es "bye"
-                if home and away:
-                    round_matches.append((home, away))
+            # Horarios ocupados por los partidos que siguen en el calendario
+            obsolete_ids = set(obsolete)
+            copa_dates, venue_dates = self._get_blackout_dates()
+            occupied, moved = scheduling.occupied_slots([
+                (match['id'], match['home_team_id'], match['away_team_id'],
+                 match['match_date'], match['venue_id'], match['state'] == 'played')
+                for match in existing
+                if match['id'] not in obsolete_ids and match['state'] != 'cancelled'
+            ], copa_dates, venue_dates, set(self.venue_ids.ids))
             
-            # Repetir según número de vueltas
-            for round_num in range(self.rounds):
-                for match in round_matches:
-                    matches.append({
-                        'home': match[0],
-                        'away': match[1],
-                        'round': r + 1 + (round_num * num_rounds),
-                    })
+            # Los partidos a reprogramar llevan su id al final del cruce
+            scheduled = self._assign_slots(
+                missing + [kept[match_id] + (match_id,) for match_id in moved],
+                occupied=occupied,
+            )
         
-        return matches
+        if job:
+            job._set_progress(JOB_PROGRESS_UNLINK, 'Eliminando partidos obsoletos')
+        Match.browse(obsolete).unlink()
+        
+        created = [match for match in scheduled if len(match) == 5]
+        rescheduled = [match for match in scheduled if len(match) == 6]
+        # Una escritura por horario (fecha y sede), no una por partido
+        moved_by_slot = defaultdict(list)
+        for _round, _home_id, _away_id, start, venue_id, match_id in rescheduled:
+            moved_by_slot[start, venue_id or False].append(match_id)
+        for (start, venue_id), match_ids in moved_by_slot.items():
+            Match.browse(match_ids).write({'match_date': start, 'venue_id': venue_id})
+        
+        if job:
+            job._set_progress(JOB_PROGRESS_CREATE[0], 'Creando partidos')
+        last_sequence = Match._read_group([('copa_id', '=', self.id)], [], ['sequence:max'])[0][0]
+        self._create_matches(created, 'round_robin', job=job, first_sequence=(last_sequence or 0) + 1)
+        
+        # Métricas sobre el calendario resultante completo
+        replaced_ids = obsolete_ids.union(match[5] for match in rescheduled)
+        self.write(self._get_schedule_metrics([
+            (kept.get(match['id'], (0,))[0], match['home_team_id'], match['away_team_id'],
+             match['match_date'], match['venue_id'])
+            for match in existing
+            if match['id'] not in replaced_ids and match['match_date']
+        ] + [match[:5] for match in scheduled]))
+        
+        # Equipos nuevos o retirados: una reconstrucción al final de la transacción
+        self._mark_standings_dirty()
+        
+        return {
+            'created': len(created),
+            'moved': len(rescheduled),
+            'deleted': len(obsolete),
+            'kept': len(existing) - len(obsolete) - len(rescheduled),
+        }
+
+    def _generate_round_robin(self, teams):
+        """
+        Algoritmo round-robin cíclico (todos contra todos).
+        Retorna cruces (jornada, id_local, id_visitante); ver core.round_robin.
+        """
+        return round_robin.generate(
+            teams.ids, legs=self.rounds, canonical=self.optimize_schedule,
+        )
+
+    def _balance_schedule(self, fixtures):
+        """
+        Balancea local/visitante y asigna fecha, hora y sede a cada partido
+        """
+        if not self.optimize_schedule:
+            fixtures = round_robin.balance_home_away(fixtures, self.team_ids.ids)
+        return self._assign_slots(fixtures)
+
+    def _optimize_schedule(self, fixtures):
+        """Búsqueda local de quiebres y horarios (ver core.scheduling.optimize_home_away)"""
+        return scheduling.optimize_home_away(
+            fixtures, time_budget=self.schedule_time_budget, seed=self.id or 0,
+        )
+
+    @api.model
+    def _get_schedule_metrics(self, scheduled):
+        """
+        Calidad del calendario ya programado: quiebres local/visitante,
+        mayor desbalance de localía y diferencia entre las horas promedio
+        de juego de los equipos
+        """
+        breaks, spread, time_spread = scheduling.schedule_metrics(scheduled)
+        return {
+            'schedule_breaks': breaks,
+            'schedule_home_away_spread': spread,
+            'schedule_time_spread': time_spread,
+        }
 
-    def _balance_schedule(self, matches):
+    # ============================================
+    # HORARIOS Y SEDES
+    # ============================================
+
+    def _get_slot_templates(self):
         """
-        Algoritmo de balanceo de calendario
-        Solo juegos los fines de semana: sábado y domingo
-        - Sábado: 2 juegos a las 9:30 y 12:00
-        - Domingo: 2 juegos a las 9:30 y 12:00
+        Horarios semanales: {día_semana: [(hora_inicio, venue_id, terrenos), ...]}
+        Cada horario de sede se divide en partidos consecutivos según la
+        duración configurada.
         """
-        balanced = []
+        if not self.venue_ids:
+            return scheduling.DEFAULT_SLOT_TEMPLATES
         
-        # Obtener fecha de inicio
+        duration = self.game_duration or scheduling.DEFAULT_GAME_DURATION
+        templates = scheduling.slot_templates([
+            (venue.id, venue.field_count, [
+                (int(slot.weekday), slot.time_start, slot.time_end)
+                for slot in venue.slot_ids
+            ])
+            for venue in self.venue_ids
+        ], duration)
+        if not templates:
+            raise UserError(
+                'Las sedes de la copa no tienen horarios donde quepa un partido de %s horas.' % duration
+            )
+        return templates
+
+    def _get_blackout_dates(self):
+        """
+        Fechas bloqueadas: (fechas de toda la copa, {venue_id: fechas de la sede})
+        """
+        blackouts = self.env['beiscool.venue.blackout'].search([
+            '|',
+            ('copa_id', '=', self.id),
+            '&', ('copa_id', '=', False), ('venue_id', 'in', self.venue_ids.ids),
+        ])
+        copa_dates = set()
+        venue_dates = defaultdict(set)
+        for blackout in blackouts:
+            if blackout.venue_id:
+                venue_dates[blackout.venue_id.id].add(blackout.date)
+            else:
+                copa_dates.add(blackout.date)
+        return copa_dates, venue_dates
+
+    def _iter_schedule_days(self, start_date):
+        """
+        Días con horarios disponibles desde start_date: (fecha, [(datetime, venue_id), ...])
+        """
+        copa_dates, venue_dates = self._get_blackout_dates()
+        return scheduling.iter_schedule_days(
+            start_date, self._get_slot_templates(), copa_dates, venue_dates,
+        )
+
+    def _assign_slots(self, fixtures, occupied=None):
+        """
+        Empaqueta los cruces en los horarios de las sedes, a lo sumo un
+        partido por equipo y día (ver core.scheduling.assign_slots).
+        occupied: horarios y equipos ya ocupados por partidos que se conservan.
+        Retorna (jornada, id_local, id_visitante, inicio, venue_id).
+        """
+        days = self._iter_schedule_days(self._get_schedule_start_date())
+        return scheduling.assign_slots(fixtures, days, len(self.team_ids), occupied=occupied)
+
+    def _get_schedule_start_date(self):
+        """Primer día programable: inicio de la copa, y nunca antes de hoy si ya empezó"""
         start_date = self.date_start or fields.Date.today()
+        if self.state == 'in_progress':
+            start_date = max(start_date, fields.Date.today())
+        return start_date
+
+    def _create_matches(self, scheduled, stage, job=None, first_sequence=1):
+        """
+        Crear registros de partidos en un solo create por lotes, o en lotes
+        de JOB_CHUNK_SIZE con un commit cada uno si corre en un trabajo
+        """
+        Match = self.env['beiscool.match']
+        vals_list = self._prepare_match_values(scheduled, stage, first_sequence)
+        if not job:
+            return Match.create(vals_list)
         
-        # Encontrar el primer sábado desde la fecha de inicio
-        current_date = start_date
-        while current_date.weekday() != 5:  # 5 = Sábado
-            current_date += timedelta(days=1)
-        
-        # Horarios disponibles: 9:30 y 12:00
-        # time_index 0 = 9:30, 1 = 12:00
-        time_slots = [
-            datetime.min.time().replace(hour=9, minute=30),
-            datetime.min.time().replace(hour=12, minute=0),
-        ]
-        
-        # Contadores para balanceo
-        home_count = {team.id: 0 for team in self.team_ids}
-        away_count = {team.id: 0 for team in self.team_ids}
-        
-        # Asignar fechas y horarios
-        time_index = 0  # Empezar con el primer horario (9:30)
-        
-        for idx, match in enumerate(matches):
-            # Determinar si es home o away basado en balanceo
-            home_id = match['home'].id
-            away_id = match['away'].id
-            
-            # Intercambiar si es necesario para balancear
-            if home_count[home_id] > away_count[away_id] + 1:
-                # Intercambiar
-                match['home'], match['away'] = match['away'], match['home']
-                home_id, away_id = away_id, home_id
-            
-            # Actualizar contadores
-            home_count[home_id] += 1
-            away_count[away_id] += 1
-            
-            # Asignar fecha y hora (hora fija sin conversión de timezone)
-            # Crear string de fecha y hora directamente
-            date_str = current_date.strftime('%Y-%m-%d')
-            time_str = time_slots[time_index].strftime('%H:%M:%S')
-            match['match_date'] = f"{date_str} {time_str}"
-            
-            balanced.append(match)
-            
-            # Avanzar al siguiente horario
-            time_index += 1
-            
-            # Si ya usamos los 2 horarios del día, pasar al siguiente día
-            if time_index >= len(time_slots):
-                time_index = 0
-                # Si es sábado (weekday 5), avanzar al domingo
-                # Si es domingo (weekday 6), avanzar al siguiente sábado (6 días más)
-                if current_date.weekday() == 5:  # 5 = Sábado
-                    current_date += timedelta(days=1)  # Ir a domingo
-                elif current_date.weekday() == 6:  # 6 = Domingo
-                    current_date += timedelta(days=6)  # Ir al siguiente sábado (domingo + 6 = siguiente sábado)
-        
-        return balanced
-
-    def _create_matches(self, matches_data, stage):
-        """Crear registros de partidos"""
+        matches = Match
+        total = len(vals_list)
+        for start in range(0, total, JOB_CHUNK_SIZE):
+            matches |= Match.create(vals_list[start:start + JOB_CHUNK_SIZE])
+            done = min(start + JOB_CHUNK_SIZE, total)
+            job._set_progress(
+                JOB_PROGRESS_CREATE[0] + (JOB_PROGRESS_CREATE[1] - JOB_PROGRESS_CREATE[0]) * done / total,
+                'Partidos creados: %s de %s' % (done, total),
+            )
+        return matches
+
+    def _unlink_matches_by_chunks(self, job):
+        """Elimina los partidos de la copa en lotes, con un commit por lote"""
+        Match = self.env['beiscool.match']
+        total = Match.search_count([('copa_id', '=', self.id)])
+        done = 0
+        while True:
+            matches = Match.search([('copa_id', '=', self.id)], limit=JOB_CHUNK_SIZE)
+            if not matches:
+                break
+            done += len(matches)
+            matches.unlink()
+            job._set_progress(
+                JOB_PROGRESS_UNLINK * done / total,
+                'Partidos eliminados: %s de %s' % (done, total),
+            )
+
+    def _prepare_match_values(self, scheduled, stage, first_sequence=1):
+        """Valores de creación de los partidos programados"""
+        return [{
+            'name': f'Partido {sequence}',
+            'copa_id': self.id,
+            'home_team_id': home_id,
+            'away_team_id': away_id,
+            'match_date': start or False,
+            'venue_id': venue_id or False,
+            'stage': stage,
+            'sequence': sequence,
+            'state': 'scheduled',
+        } for sequence, (_round, home_id, away_id, start, venue_id) in enumerate(scheduled, first_sequence)]
+
+    # ============================================
+    # REPROGRAMACIÓN
+    # ============================================
+
+    def _get_occupancy_index(self, after):
+        """
+        Ocupación del calendario desde el día anterior a after: partidos de
+        la copa y de otras copas que comparten sus sedes o sus árbitros
+        (ver core.scheduling.OccupancyIndex)
+        """
+        referee_ids = self.referee_ids.ids + self.match_ids.referee_id.ids
+        rows = self.env['beiscool.match'].search_read([
+            ('state', '!=', 'cancelled'),
+            ('match_date', '>=', after - timedelta(days=1)),
+            '|', '|',
+            ('copa_id', '=', self.id),
+            ('venue_id', 'in', self.venue_ids.ids),
+            ('referee_id', 'in', referee_ids),
+        ], ['home_team_id', 'away_team_id', 'match_date', 'venue_id', 'referee_id', 'copa_id'], load=None)
+        return scheduling.OccupancyIndex([
+            (row['id'], row['home_team_id'], row['away_team_id'],
+             row['match_date'], row['venue_id'], row['referee_id'], row['copa_id'])
+            for row in rows
+        ], duration=self.game_duration or scheduling.DEFAULT_GAME_DURATION, copa_id=self.id)
+
+    def _reschedule_matches(self, matches, after):
+        """
+        Reprograma partidos no jugados de la copa (suspendidos, cancelados o
+        aplazados) en el primer horario libre posterior a after donde no
+        jueguen sus equipos, quede un terreno libre en la sede y su árbitro
+        no tenga otro partido. Se ubican en su orden original; un fin de
+        semana completo se reprograma en una sola operación.
+        Retorna los partidos sin horario libre en RESCHEDULE_HORIZON_DAYS días.
+        """
+        self.ensure_one()
         Match = self.env['beiscool.match']
+        if matches.copa_id - self:
+            raise UserError('Solo puede reprogramar partidos de la copa %s.' % self.name)
+        if any(match.state == 'played' for match in matches):
+            raise UserError('No se puede reprogramar un partido jugado.')
         
-        for idx, match_data in enumerate(matches_data):
-            Match.create({
-                'name': f'Partido {idx + 1}',
-                'copa_id': self.id,
-                'home_team_id': match_data['home'].id,
-                'away_team_id': match_data['away'].id,
-                'match_date': match_data.get('match_date', False),
-                'stage': stage,
-                'sequence': idx + 1,
+        ordered = matches.sorted(lambda match: (match.match_date or datetime.max, match.sequence, match.id))
+        last_date = after.date() + timedelta(days=RESCHEDULE_HORIZON_DAYS)
+        days = list(itertools.takewhile(
+            lambda day: day[0] <= last_date, self._iter_schedule_days(after.date()),
+        ))
+        slots = scheduling.reschedule(self._get_occupancy_index(after), [
+            (match.id, match.home_team_id.id, match.away_team_id.id, match.referee_id.id)
+            for match in ordered
+        ], days, after)
+        
+        unplaced = Match
+        # Una escritura por fecha original y una por horario nuevo, no una por partido
+        by_original_date = defaultdict(list)
+        by_slot = defaultdict(list)
+        for match in ordered:
+            slot = slots[match.id]
+            if not slot:
+                unplaced |= match
+                continue
+            if not match.original_date and match.match_date:
+                by_original_date[match.match_date].append(match.id)
+            by_slot[slot[0], slot[1] or False].append(match.id)
+        for original_date, match_ids in by_original_date.items():
+            Match.browse(match_ids).write({'original_date': original_date})
+        for (start, venue_id), match_ids in by_slot.items():
+            Match.browse(match_ids).write({
+                'match_date': start,
+                'venue_id': venue_id,
                 'state': 'scheduled',
             })
+        return unplaced
 
     def _generate_semifinals(self):
         """Genera partidos de semifinal basados en la tabla de posiciones"""
+        self.env['beiscool.standings']._flush_pending_standings()
+        
         if not self.standings_ids or len(self.standings_ids) < 4:
             return
         
-        # Obtener los 4 primeros equipos
-        top_teams = self.standings_ids.sorted(
-            key=lambda x: (x.matches_won, x.run_differential),
-            reverse=True
-        )[:4]
+        # Obtener los 4 primeros equipos según la tabla con desempates
+        top_teams = self.standings_ids.sorted(key=lambda x: (x.position, x.id))[:4]
         
-        Match = self.env['beiscool.match']
+        sequence = len(self.match_ids)
         
-        # Semifinal 1: 1° vs 4°
-        Match.create({
+        # Semifinal 1: 1° vs 4° / Semifinal 2: 2° vs 3°
+        self.env['beiscool.match'].create([{
             'name': 'Semifinal 1',
             'copa_id': self.id,
             'home_team_id': top_teams[0].team_id.id,
             'away_team_id': top_teams[3].team_id.id,
             'stage': 'semifinal',
-            'sequence': len(self.match_ids) + 1,
+            'sequence': sequence + 1,
             'state': 'scheduled',
-        })
-        
-        # Semifinal 2: 2° vs 3°
-        Match.create({
+        }, {
             'name': 'Semifinal 2',
             'copa_id': self.id,
             'home_team_id': top_teams[1].team_id.id,
             'away_team_id': top_teams[2].team_id.id,
             'stage': 'semifinal',
-            'sequence': len(self.match_ids) + 2,
+            'sequence': sequence + 2,
             'state': 'scheduled',
-        })
+        }])
 
     def _generate_final(self):
         """Genera el partido final"""
@@ -457,68 +1030,283 @@ class BeiscoolCopa(models.Model):
     # TABLA DE POSICIONES
     # ============================================
 
-    def _compute_standings(self):
-        """Calcula y actualiza la tabla de posiciones"""
-        self.ensure_one()
+    def _mark_standings_dirty(self):
+        """
+        Solicita una reconstrucción de la tabla. Se ejecuta una sola vez por
+        copa, al final de la transacción, sin importar cuántas veces se pida.
+        """
+        self.env['beiscool.standings']._queue_rebuild(self.ids)
+
+    def _read_standings_totals(self):
+        """
+        Totales de round-robin por equipo y rival en una sola consulta
+        agrupada (lado local UNION ALL lado visitante).
+        Retorna: {(copa_id, team_id): {campo: valor}}, con las claves
+        ('head_to_head', id_rival, campo) de la matriz de encuentros directos.
+        """
+        if not self.ids:
+            return {}
         
-        # Eliminar standings existentes
-        self.standings_ids.unlink()
+        self.env['beiscool.match'].flush_model([
+            'copa_id', 'home_team_id', 'away_team_id',
+            'home_runs', 'away_runs', 'state', 'stage',
+        ])
+        self.env.cr.execute("""
+            SELECT sides.copa_id,
+                   sides.team_id,
+                   sides.opponent_id,
+                   COUNT(*),
+                   SUM(sides.won),
+                   SUM(sides.scored),
+                   SUM(sides.allowed)
+              FROM (
+                    SELECT copa_id,
+                           home_team_id AS team_id,
+                           away_team_id AS opponent_id,
+                           CASE WHEN COALESCE(home_runs, 0) > COALESCE(away_runs, 0) THEN 1 ELSE 0 END AS won,
+                           COALESCE(home_runs, 0) AS scored,
+                           COALESCE(away_runs, 0) AS allowed
+                      FROM beiscool_match
+                     WHERE copa_id IN %s AND state = 'played' AND stage = 'round_robin'
+                 UNION ALL
+                    SELECT copa_id,
+                           away_team_id,
+                           home_team_id,
+                           CASE WHEN COALESCE(away_runs, 0) > COALESCE(home_runs, 0) THEN 1 ELSE 0 END,
+                           COALESCE(away_runs, 0),
+                           COALESCE(home_runs, 0)
+                      FROM beiscool_match
+                     WHERE copa_id IN %s AND state = 'played' AND stage = 'round_robin'
+                   ) AS sides
+          GROUP BY sides.copa_id, sides.team_id, sides.opponent_id
+        """, [tuple(self.ids), tuple(self.ids)])
         
+        return standings_core.fold_totals(self.env.cr.fetchall())
+
+    def _compute_standings(self):
+        """
+        Reconstrucción completa de la tabla de posiciones.
+        La actualización normal es incremental (ver beiscool.match.write);
+        este método se usa para reparar la tabla. Los totales salen de una
+        sola consulta agrupada y se escriben en bloque: las filas existentes
+        se actualizan en lugar de eliminarse y recrearse.
+        """
         Standings = self.env['beiscool.standings']
         
-        # Obtener equipos
-        teams = self.team_ids
+        totals = self._read_standings_totals()
         
-        # Obtener partidos jugados (solo round-robin)
-        matches = self.match_ids.filtered(
-            lambda m: m.stage == 'round_robin' and m.state == 'played'
-        )
+        # Filas existentes por (copa, equipo); se eliminan las de equipos que ya no están en la copa
+        valid_keys = {(team.copa_id.id, team.id) for team in self.team_ids}
+        rows_by_key = {}
+        obsolete = Standings
+        for row in Standings.search([('copa_id', 'in', self.ids)]):
+            key = (row.copa_id.id, row.team_id.id)
+            if key in valid_keys and key not in rows_by_key:
+                rows_by_key[key] = row
+            else:
+                obsolete |= row
+        obsolete.unlink()
         
-        for team in teams:
-            # Partidos jugados como local
-            home_matches = matches.filtered(lambda m: m.home_team_id == team)
-            # Partidos jugados como visitante
-            away_matches = matches.filtered(lambda m: m.away_team_id == team)
-            
-            # Total partidos jugados
-            total_matches = len(home_matches) + len(away_matches)
-            
-            # Partidos ganados
-            home_wins = len(home_matches.filtered(lambda m: m.winner_id == team))
-            away_wins = len(away_matches.filtered(lambda m: m.winner_id == team))
-            matches_won = home_wins + away_wins
-            
-            # Partidos perdidos
-            matches_lost = total_matches - matches_won
-            
-            # Carreras anotadas (como local)
-            runs_scored_home = sum(home_matches.mapped('home_runs'))
-            # Carreras anotadas (como visitante)
-            runs_scored_away = sum(away_matches.mapped('away_runs'))
-            runs_scored = runs_scored_home + runs_scored_away
-            
-            # Carreras permitidas (como local)
-            runs_allowed_home = sum(home_matches.mapped('away_runs'))
-            # Carreras permitidas (como visitante)
-            runs_allowed_away = sum(away_matches.mapped('home_runs'))
-            runs_allowed = runs_allowed_home + runs_allowed_away
-            
-            # Diferencia de carreras
-            run_differential = runs_scored - runs_allowed
-            
-            # Puntos (3 por victoria, 0 por derrota)
-            points = matches_won * 3
-            
-            Standings.create({
-                'copa_id': self.id,
-                'team_id': team.id,
-                'matches_played': total_matches,
-                'matches_won': matches_won,
-                'matches_lost': matches_lost,
-                'runs_scored': runs_scored,
-                'runs_allowed': runs_allowed,
-                'run_differential': run_differential,
-                'points': points,
-            })
+        # Agrupar las filas por valores idénticos para escribirlas en bloque
+        rows_by_values = {}
+        vals_list = []
+        for key in valid_keys:
+            counters = totals.get(key, {})
+            values = Standings._prepare_counters_values(counters)
+            values['head_to_head'] = Standings._merge_head_to_head({}, counters)
+            row = rows_by_key.get(key)
+            if not row:
+                values.update({'copa_id': key[0], 'team_id': key[1]})
+                vals_list.append(values)
+            elif any(row[name] != value for name, value in values.items()):
+                values_key = json.dumps(values, sort_keys=True)
+                if values_key in rows_by_values:
+                    rows_by_values[values_key][1].append(row.id)
+                else:
+                    rows_by_values[values_key] = (values, [row.id])
+        
+        for values, row_ids in rows_by_values.values():
+            Standings.browse(row_ids).write(values)
+        
+        if vals_list:
+            Standings.create(vals_list)
+        
+        Standings._assign_positions(self.ids)
+        
+        # Estadísticas de los equipos (todas las etapas)
+        self.team_ids._recompute_match_counters()
         
         return True
+
+    # ============================================
+    # CALENDARIO DE ODOO
+    # ============================================
+
+    def action_sync_calendar(self):
+        """Sincroniza ahora los eventos de los partidos modificados de las copas"""
+        copas = self.filtered('calendar_sync')
+        matches = self.env['beiscool.match'].search([
+            ('copa_id', 'in', copas.ids),
+            ('calendar_sync_needed', '=', True),
+        ])
+        matches._sync_calendar_events()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': 'Eventos de calendario sincronizados: %s partidos.' % len(matches),
+                'type': 'success',
+            },
+        }
+
+    # ============================================
+    # TRABAJOS EN SEGUNDO PLANO
+    # ============================================
+
+    def _compute_job_state(self):
+        """Último trabajo de cada copa, en una sola consulta agrupada"""
+        last_job_ids = dict(self.env['beiscool.job']._read_group(
+            [('copa_id', 'in', self.ids)], ['copa_id'], ['id:max'],
+        ))
+        for copa in self:
+            job = self.env['beiscool.job'].browse(last_job_ids.get(copa, False))
+            copa.job_id = job
+            copa.job_state = job.state or False
+            copa.job_progress = job.progress
+            copa.job_progress_message = job.progress_message
+            copa.job_error = job.error
+
+    def _job_generate_calendar(self, job):
+        """Ejecución del trabajo 'generate_calendar' (ver beiscool.job._run)"""
+        self.ensure_one()
+        self._check_generate_calendar()
+        
+        with BeiscoolPerfProbe(self.env, 'job_generate_calendar', copa_id=self.id) as probe:
+            self._generate_calendar(probe, job=job)
+            job._set_progress(JOB_PROGRESS_CREATE[1], 'Calculando tabla de posiciones')
+            # La tabla marcada se reconstruye aquí y no en el commit final
+            self.env['beiscool.standings']._flush_pending_standings()
+
+    def _job_regenerate_calendar(self, job):
+        """Ejecución del trabajo 'regenerate_calendar' (ver beiscool.job._run)"""
+        self.ensure_one()
+        self._check_regenerate_calendar()
+        
+        with BeiscoolPerfProbe(self.env, 'job_regenerate_calendar', copa_id=self.id) as probe:
+            stats = self._regenerate_calendar(probe, job=job)
+            job._set_progress(
+                JOB_PROGRESS_CREATE[1],
+                '%(created)s nuevos, %(moved)s reprogramados, %(deleted)s eliminados' % stats,
+            )
+            self.env['beiscool.standings']._flush_pending_standings()
+
+    def _job_rebuild_standings(self, job):
+        """Ejecución del trabajo 'rebuild_standings' (ver beiscool.job._run)"""
+        self.ensure_one()
+        job._set_progress(10.0, 'Reconstruyendo tabla de posiciones')
+        with BeiscoolPerfProbe(self.env, 'job_rebuild_standings', copa_id=self.id) as probe, \
+                probe.phase('compute'):
+            self._compute_standings()
+
+    # ============================================
+    # DATOS SINTÉTICOS (PRUEBAS DE CARGA)
+    # ============================================
+
+    @api.model
+    def _generate_synthetic_data(self, copa_count=1, team_count=16, player_count=12,
+                                 referee_count=4, played_ratio=1.0, seed=0, with_images=True):
+        """
+        Genera copas de prueba con equipos, jugadores, árbitros, imágenes,
+        calendario y resultados. Es determinista para una misma semilla
+        (salvo los ids) y crea todo en lotes: 50 copas de 64 equipos
+        (~100.000 partidos) se generan en pocos minutos.
+        
+        Uso desde la consola de Odoo:
+            env['beiscool.copa']._generate_synthetic_data(copa_count=50, team_count=64)
+            env.cr.commit()
+        
+        Retorna las copas creadas.
+        """
+        started = time.perf_counter()
+        rng = random.Random(seed)
+        Team = self.env['beiscool.team']
+        Player = self.env['beiscool.player']
+        Referee = self.env['beiscool.referee']
+        
+        palette = [
+            base64.b64encode(_synthetic_png((rng.randrange(256), rng.randrange(256), rng.randrange(256))))
+            for _i in range(24)
+        ] if with_images else [False]
+        
+        def person_name(index):
+            return '%s %s %s' % (
+                SYNTHETIC_FIRST_NAMES[index % len(SYNTHETIC_FIRST_NAMES)],
+                SYNTHETIC_LAST_NAMES[(index // len(SYNTHETIC_FIRST_NAMES)) % len(SYNTHETIC_LAST_NAMES)],
+                index,
+            )
+        
+        copas = self.create([{
+            'name': 'Copa Sintética %s-%03d' % (seed, index + 1),
+            'date_start': date(2024 + index % 3, 1 + rng.randrange(12), 1),
+            'location': 'Estadio %s' % (index + 1),
+            'organizer': 'Generador de datos',
+            'has_semifinal': False,
+            'has_final': False,
+        } for index in range(copa_count)])
+        
+        referees = Referee.create([{
+            'name': person_name(index),
+            'level': rng.choice(('local', 'regional', 'national', 'international')),
+            'experience_years': rng.randint(1, 30),
+            'image': rng.choice(palette),
+        } for index in range(referee_count)])
+        if referees:
+            for copa in copas:
+                copa.referee_ids = [Command.set(rng.sample(referees.ids, min(len(referees), 3)))]
+        
+        teams = Team.create([{
+            'name': '%s %s-%s' % (SYNTHETIC_TEAM_NAMES[index % len(SYNTHETIC_TEAM_NAMES)], copa_index + 1, index + 1),
+            'copa_id': copa.id,
+            'color': rng.randrange(12),
+            'image': rng.choice(palette),
+        } for copa_index, copa in enumerate(copas) for index in range(team_count)])
+        
+        Player.create([{
+            'name': person_name(team_index * player_count + number),
+            'number': number,
+            'is_captain': number == 1,
+            'position': rng.choice(('P', 'C', '1B', '2B', '3B', 'SS', 'LF', 'CF', 'RF')),
+            'image': rng.choice(palette),
+            'team_ids': [Command.set(team.ids)],
+        } for team_index, team in enumerate(teams) for number in range(1, player_count + 1)])
+        
+        # Calendario y resultados de todas las copas; los partidos se crean
+        # ya jugados para no pasar por una escritura por partido
+        vals_list = []
+        for copa in copas:
+            scheduled = copa._balance_schedule(copa._generate_round_robin(copa.team_ids.sorted('name')))
+            scheduled.sort(key=lambda match: (match[3], match[0]))
+            played = round(len(scheduled) * played_ratio)
+            match_vals = copa._prepare_match_values(scheduled, 'round_robin')
+            for vals in match_vals[:played]:
+                home_runs, away_runs = rng.randint(0, 12), rng.randint(0, 12)
+                if home_runs == away_runs:
+                    home_runs += 1
+                vals.update({'home_runs': home_runs, 'away_runs': away_runs, 'state': 'played'})
+            vals_list.extend(match_vals)
+        
+        Match = self.env['beiscool.match']
+        for start in range(0, len(vals_list), SYNTHETIC_MATCH_BATCH):
+            Match.create(vals_list[start:start + SYNTHETIC_MATCH_BATCH])
+        
+        copas.write({'state': 'in_progress'})
+        # Una reconstrucción por copa en lugar de las diferencias de cada partido
+        copas._mark_standings_dirty()
+        self.env['beiscool.standings']._flush_pending_standings()
+        
+        _logger.info(
+            'Datos sintéticos: %s copas, %s equipos, %s jugadores, %s partidos en %.1fs',
+            len(copas), len(teams), len(teams) * player_count, len(vals_list),
+            time.perf_counter() - started,
+        )
+        return copas
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+
+from odoo import models, fields, api
+
+# Tamaños de las variantes redimensionadas (lado máximo en píxeles)
+IMAGE_SIZES = (128, 256, 512)
+
+
+class BeiscoolImageMixin(models.AbstractModel):
+    _name = 'beiscool.image.mixin'
+    _description = 'Imagen con Variantes Redimensionadas'
+
+    image = fields.Image(
+        string='Imagen',
+        max_width=1920,
+        max_height=1920,
+    )
+
+    # Variantes generadas una sola vez al subir la imagen y guardadas como adjuntos
+    image_512 = fields.Image(
+        string='Imagen 512',
+        related='image',
+        max_width=512,
+        max_height=512,
+        store=True,
+    )
+
+    image_256 = fields.Image(
+        string='Imagen 256',
+        related='image',
+        max_width=256,
+        max_height=256,
+        store=True,
+    )
+
+    image_128 = fields.Image(
+        string='Imagen 128',
+        related='image',
+        max_width=128,
+        max_height=128,
+        store=True,
+    )
+
+    # Huella del contenido: cambia la URL de las variantes cuando cambia la imagen
+    image_checksum = fields.Char(
+        string='Huella de la Imagen',
+        compute='_compute_image_checksum',
+        store=True,
+    )
+
+    # Indicador guardado: las plantillas lo usan en lugar de leer el adjunto binario
+    has_image = fields.Boolean(
+        string='Tiene Imagen',
+        compute='_compute_has_image',
+        store=True,
+    )
+
+    @api.depends('image')
+    def _compute_image_checksum(self):
+        for record in self:
+            if record.image:
+                record.image_checksum = hashlib.sha1(record.image).hexdigest()[:16]
+            else:
+                record.image_checksum = False
+
+    @api.depends('image_checksum')
+    def _compute_has_image(self):
+        for record in self:
+            record.has_image = bool(record.image_checksum)
+
+    def get_image_url(self, size=128):
+        """
+        URL pública de una variante de la imagen. Incluye la huella del
+        contenido, por lo que puede cachearse como inmutable.
+        """
+        self.ensure_one()
+        return '/beiscool/image/%s/%s/%s/%s' % (
+            self._name, self.id, size, self.image_checksum or 'none',
+        )
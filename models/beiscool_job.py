@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+import logging
+import time
+import traceback
+
+from psycopg2 import errors as pg_errors
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Errores de concurrencia de PostgreSQL que justifican reintentar el trabajo
+RETRYABLE_ERRORS = (
+    pg_errors.SerializationFailure,
+    pg_errors.DeadlockDetected,
+    pg_errors.LockNotAvailable,
+)
+
+# Registros creados o eliminados entre dos commits de un trabajo
+JOB_CHUNK_SIZE = 500
+
+# Segundos que un worker toma trabajos antes de devolver el cron
+JOB_WORKER_TIME_LIMIT = 240
+
+# Espera base (segundos) antes de reintentar; se duplica en cada intento
+JOB_RETRY_DELAY = 10
+
+# Crons que procesan la cola: cada uno corre en un worker distinto
+JOB_CRON_XMLIDS = (
+    'beiscool.ir_cron_beiscool_job_worker_1',
+    'beiscool.ir_cron_beiscool_job_worker_2',
+    'beiscool.ir_cron_beiscool_job_worker_3',
+)
+
+# Método de beiscool.copa que ejecuta cada tipo de trabajo
+JOB_METHODS = {
+    'generate_calendar': '_job_generate_calendar',
+    'regenerate_calendar': '_job_regenerate_calendar',
+    'rebuild_standings': '_job_rebuild_standings',
+}
+
+
+class BeiscoolJob(models.Model):
+    _name = 'beiscool.job'
+    _description = 'Trabajo en Segundo Plano'
+    _order = 'id desc'
+
+    name = fields.Char(
+        string='Trabajo',
+        required=True,
+    )
+
+    copa_id = fields.Many2one(
+        'beiscool.copa',
+        string='Copa',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+
+    job_type = fields.Selection([
+        ('generate_calendar', 'Generar Calendario'),
+        ('regenerate_calendar', 'Actualizar Calendario'),
+        ('rebuild_standings', 'Reconstruir Tabla'),
+    ], string='Tipo', required=True)
+
+    state = fields.Selection([
+        ('pending', 'Pendiente'),
+        ('running', 'En Ejecución'),
+        ('done', 'Terminado'),
+        ('failed', 'Fallido'),
+    ], string='Estado', default='pending', required=True, index=True)
+
+    progress = fields.Float(
+        string='Progreso (%)',
+        default=0.0,
+    )
+
+    progress_message = fields.Char(
+        string='Etapa',
+    )
+
+    attempts = fields.Integer(
+        string='Intentos',
+        default=0,
+    )
+
+    max_attempts = fields.Integer(
+        string='Intentos Máximos',
+        default=5,
+        help='Reintentos ante fallas de serialización o bloqueos de PostgreSQL',
+    )
+
+    date_next_try = fields.Datetime(
+        string='Próximo Intento',
+        default=fields.Datetime.now,
+        required=True,
+    )
+
+    date_started = fields.Datetime(
+        string='Inicio',
+        readonly=True,
+    )
+
+    date_finished = fields.Datetime(
+        string='Fin',
+        readonly=True,
+    )
+
+    error = fields.Text(
+        string='Error',
+        readonly=True,
+    )
+
+    user_id = fields.Many2one(
+        'res.users',
+        string='Solicitado por',
+        default=lambda self: self.env.user,
+    )
+
+    # ============================================
+    # COLA
+    # ============================================
+
+    @api.model
+    def _enqueue(self, copas, job_type):
+        """
+        Encola un trabajo por copa y despierta a los workers. Una copa con
+        un trabajo del mismo tipo pendiente o en ejecución no se encola de
+        nuevo.
+        """
+        active = self.search([
+            ('copa_id', 'in', copas.ids),
+            ('job_type', '=', job_type),
+            ('state', 'in', ('pending', 'running')),
+        ])
+        queued_copa_ids = set(active.copa_id.ids)
+        label = dict(self._fields['job_type'].selection)[job_type]
+        jobs = active | self.create([{
+            'name': '%s: %s' % (label, copa.name),
+            'copa_id': copa.id,
+            'job_type': job_type,
+            'progress_message': 'En cola',
+        } for copa in copas if copa.id not in queued_copa_ids])
+        self._trigger_workers(len(jobs))
+        return jobs
+
+    @api.model
+    def _trigger_workers(self, count=len(JOB_CRON_XMLIDS), at=None):
+        """Programa una ejecución (inmediata o en at) de hasta count crons de la cola"""
+        for xmlid in JOB_CRON_XMLIDS[:max(count, 1)]:
+            cron = self.env.ref(xmlid, raise_if_not_found=False)
+            if cron:
+                cron.sudo()._trigger(at)
+
+    # ============================================
+    # WORKERS
+    # ============================================
+
+    @api.model
+    def _process_jobs(self):
+        """
+        Punto de entrada de los crons: toma trabajos hasta vaciar la cola o
+        agotar JOB_WORKER_TIME_LIMIT. Cada cron corre en su propio worker,
+        así que varias copas se procesan en paralelo.
+        """
+        self._requeue_stale_jobs()
+        deadline = time.monotonic() + JOB_WORKER_TIME_LIMIT
+        while time.monotonic() < deadline:
+            job = self._acquire_next_job()
+            if not job:
+                return
+            job._run()
+        # Se agotó el tiempo con trabajos en cola: otro turno del cron
+        if self.search_count([('state', '=', 'pending')], limit=1):
+            self._trigger_workers(1)
+
+    @api.model
+    def _acquire_next_job(self):
+        """
+        Toma el siguiente trabajo pendiente cuya copa no esté bloqueada por
+        otro worker. Las filas se leen con SKIP LOCKED para que los workers
+        no se esperen entre sí; el trabajo tomado queda en ejecución y el
+        bloqueo de su copa, tomado.
+        """
+        cr = self.env.cr
+        cr.execute("""
+            SELECT id, copa_id
+              FROM beiscool_job
+             WHERE state = 'pending'
+               AND date_next_try <= (clock_timestamp() AT TIME ZONE 'UTC')
+          ORDER BY date_next_try, id
+             LIMIT 20
+               FOR UPDATE SKIP LOCKED
+        """)
+        for job_id, copa_id in cr.fetchall():
+            if not self._try_lock_copa(copa_id):
+                continue
+            job = self.browse(job_id)
+            job.write({
+                'state': 'running',
+                'attempts': job.attempts + 1,
+                'date_started': fields.Datetime.now(),
+                'date_finished': False,
+                'progress': 0.0,
+                'progress_message': 'Iniciando',
+                'error': False,
+            })
+            cr.commit()
+            return job
+        # Libera las filas leídas con FOR UPDATE
+        cr.commit()
+        return self.browse()
+
+    @api.model
+    def _requeue_stale_jobs(self):
+        """
+        Vuelve a encolar los trabajos en ejecución cuyo worker murió: el
+        bloqueo de su copa quedó libre al cerrarse su conexión.
+        """
+        stale = self.browse()
+        for job in self.search([('state', '=', 'running')]):
+            if self._try_lock_copa(job.copa_id.id):
+                self._unlock_copa(job.copa_id.id)
+                stale |= job
+        if stale:
+            _logger.warning('Trabajos interrumpidos vueltos a encolar: %s', stale.ids)
+            stale.write({'state': 'pending', 'progress_message': 'Interrumpido, en cola'})
+            self.env.cr.commit()
+
+    # ============================================
+    # BLOQUEO POR COPA
+    # ============================================
+
+    @api.model
+    def _try_lock_copa(self, copa_id):
+        """
+        Bloqueo consultivo de sesión sobre la copa. A diferencia de un
+        bloqueo de fila, sobrevive a los commits por lote del trabajo y se
+        libera solo si el worker muere.
+        """
+        self.env.cr.execute(
+            "SELECT pg_try_advisory_lock(hashtext('beiscool.copa'), %s)", [copa_id],
+        )
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _unlock_copa(self, copa_id):
+        self.env.cr.execute(
+            "SELECT pg_advisory_unlock(hashtext('beiscool.copa'), %s)", [copa_id],
+        )
+
+    # ============================================
+    # EJECUCIÓN
+    # ============================================
+
+    def _run(self):
+        """
+        Ejecuta el trabajo con el bloqueo de su copa tomado. El trabajo hace
+        commit por lote (ver _set_progress); ante una falla de concurrencia
+        se revierte el lote en curso y se reintenta más tarde desde el
+        principio.
+        """
+        self.ensure_one()
+        cr = self.env.cr
+        copa_id = self.copa_id.id
+        try:
+            getattr(self.copa_id, JOB_METHODS[self.job_type])(self)
+            self.write({
+                'state': 'done',
+                'progress': 100.0,
+                'progress_message': 'Terminado',
+                'date_finished': fields.Datetime.now(),
+            })
+            cr.commit()
+        except RETRYABLE_ERRORS as error:
+            cr.rollback()
+            self._retry_later(error)
+        except UserError as error:
+            cr.rollback()
+            self._fail(error.args[0])
+        except Exception:
+            cr.rollback()
+            _logger.exception('Falló el trabajo %s (%s)', self.id, self.name)
+            self._fail(traceback.format_exc())
+        finally:
+            self._unlock_copa(copa_id)
+            cr.commit()
+
+    def _set_progress(self, progress, message):
+        """Guarda el avance y hace commit: cierra el lote en curso"""
+        self.write({
+            'progress': min(max(progress, 0.0), 100.0),
+            'progress_message': message,
+        })
+        self.env.cr.commit()
+
+    def _retry_later(self, error):
+        """Reintento con espera exponencial, o falla si se agotaron los intentos"""
+        if self.attempts >= self.max_attempts:
+            self._fail('Se agotaron los reintentos: %s' % error)
+            return
+        delay = JOB_RETRY_DELAY * 2 ** max(self.attempts - 1, 0)
+        date_next_try = fields.Datetime.now() + timedelta(seconds=delay)
+        _logger.info('Trabajo %s reintentado en %s s: %s', self.id, delay, error)
+        self.write({
+            'state': 'pending',
+            'date_next_try': date_next_try,
+            'progress_message': 'Reintento %s de %s (concurrencia)' % (self.attempts, self.max_attempts),
+        })
+        self._trigger_workers(1, at=date_next_try)
+        self.env.cr.commit()
+
+    def _fail(self, message):
+        self.write({
+            'state': 'failed',
+            'error': message,
+            'progress_message': 'Fallido',
+            'date_finished': fields.Datetime.now(),
+        })
+        self.env.cr.commit()
+
+    # ============================================
+    # ACCIONES
+    # ============================================
+
+    def action_retry(self):
+        """Vuelve a encolar los trabajos fallidos"""
+        failed = self.filtered(lambda job: job.state == 'failed')
+        failed.write({
+            'state': 'pending',
+            'attempts': 0,
+            'error': False,
+            'progress': 0.0,
+            'progress_message': 'En cola',
+            'date_next_try': fields.Datetime.now(),
+        })
+        self._trigger_workers(len(failed))
+        return True
@@ -1,8 +1,39 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+from datetime import timedelta
+
+import pytz
+
+from odoo import models, fields, api, tools, Command
 from odoo.exceptions import UserError
 
+from ..core import standings as standings_core
+from ..core.scheduling import DEFAULT_GAME_DURATION
+
+# Campos del partido que afectan la tabla de posiciones
+STANDINGS_TRIGGER_FIELDS = {
+    'copa_id', 'home_team_id', 'away_team_id',
+    'home_runs', 'away_runs', 'state', 'stage',
+}
+
+# Campos del partido que se reflejan en su evento de calendario
+CALENDAR_TRIGGER_FIELDS = {
+    'name', 'copa_id', 'home_team_id', 'away_team_id',
+    'match_date', 'venue_id', 'referee_id', 'state',
+}
+
+# Partidos sincronizados por commit del cron de calendario
+CALENDAR_SYNC_BATCH = 1000
+
+# Contexto de los eventos de partidos: sin invitaciones ni seguimiento por correo
+CALENDAR_EVENT_CONTEXT = {
+    'no_mail_to_attendees': True,
+    'dont_notify': True,
+    'mail_create_nolog': True,
+    'mail_notrack': True,
+    'tracking_disable': True,
+}
+
 
 class BeiscoolMatch(models.Model):
     _name = 'beiscool.match'
@@ -55,6 +86,26 @@ class BeiscoolMatch(models.Model):
         string='Fecha y Hora',
         required=False,
     )
+
+    venue_id = fields.Many2one(
+        'beiscool.venue',
+        string='Sede',
+        ondelete='set null',
+    )
+
+    referee_id = fields.Many2one(
+        'beiscool.referee',
+        string='Árbitro',
+        ondelete='set null',
+        index='btree_not_null',
+    )
+
+    original_date = fields.Datetime(
+        string='Fecha Original',
+        readonly=True,
+        copy=False,
+        help='Fecha programada antes de la primera reprogramación',
+    )
     
     match_date_formatted = fields.Char(
         string='Fecha Formateada',
@@ -107,6 +158,13 @@ class BeiscoolMatch(models.Model):
         copy=False,
     )
 
+    calendar_sync_needed = fields.Boolean(
+        string='Evento Pendiente de Sincronizar',
+        default=True,
+        copy=False,
+        readonly=True,
+    )
+
     # Campos calculados
     is_tied = fields.Boolean(
         string='Empate',
@@ -120,6 +178,30 @@ class BeiscoolMatch(models.Model):
         store=True,
     )
 
+    def init(self):
+        # Índices compuestos para los accesos de las páginas públicas:
+        # partidos de una copa por estado ordenados por fecha, y partidos
+        # de un equipo (local o visitante) dentro de una copa. Sus primeras
+        # columnas cubren también las búsquedas por copa_id, home_team_id
+        # y away_team_id solos.
+        tools.create_index(
+            self._cr, 'beiscool_match_copa_state_date_idx',
+            self._table, ['copa_id', 'state', 'match_date'],
+        )
+        tools.create_index(
+            self._cr, 'beiscool_match_home_team_copa_idx',
+            self._table, ['home_team_id', 'copa_id'],
+        )
+        tools.create_index(
+            self._cr, 'beiscool_match_away_team_copa_idx',
+            self._table, ['away_team_id', 'copa_id'],
+        )
+        # Índice parcial: el cron de calendario solo busca partidos modificados
+        tools.create_index(
+            self._cr, 'beiscool_match_calendar_sync_idx',
+            self._table, ['copa_id'], where='calendar_sync_needed',
+        )
+
     @api.depends('home_runs', 'away_runs', 'state')
     def _compute_winner(self):
         for record in self:
@@ -162,12 +244,10 @@ class BeiscoolMatch(models.Model):
         if not self.home_runs and not self.away_runs:
             raise UserError('Debe ingresar el marcador antes de marcar el partido como jugado.')
         
+        # La tabla de posiciones se ajusta en write()
         self.write({'state': 'played'})
         
-        # Recalcular tabla de posiciones
         if self.copa_id:
-            self.copa_id._compute_standings()
-            
             # Si es semifinal o final, generar siguiente partido
             if self.stage == 'semifinal':
                 self.copa_id._generate_final()
@@ -177,28 +257,252 @@ class BeiscoolMatch(models.Model):
 
     def action_cancel(self):
         """Cancelar partido"""
+        # La tabla de posiciones se ajusta en write()
         self.write({'state': 'cancelled'})
-        
-        # Recalcular tabla de posiciones
-        if self.copa_id:
-            self.copa_id._compute_standings()
 
     def action_reset(self):
         """Restablecer partido a programado"""
+        # La tabla de posiciones se ajusta en write()
         self.write({'state': 'scheduled'})
-        
-        # Recalcular tabla de posiciones
-        if self.copa_id:
-            self.copa_id._compute_standings()
+
+    def action_reschedule(self):
+        """Abre el asistente para reprogramar los partidos en horarios libres"""
+        action = self.env['ir.actions.act_window']._for_xml_id('beiscool.beiscool_match_reschedule_action')
+        action['context'] = {'active_model': self._name, 'active_ids': self.ids}
+        return action
+
+    # ============================================
+    # TABLA DE POSICIONES (INCREMENTAL)
+    # ============================================
+
+    def _get_played_tuples(self, round_robin_only=False):
+        """Partidos jugados como tuplas de core.standings"""
+        return [
+            (match.copa_id.id, match.home_team_id.id, match.away_team_id.id,
+             match.home_runs, match.away_runs)
+            for match in self
+            if match.state == 'played' and match.copa_id
+            and (not round_robin_only or match.stage == 'round_robin')
+        ]
+
+    def _get_standings_contributions(self):
+        """
+        Aporte de los partidos a la tabla de posiciones.
+        Solo cuentan los partidos jugados de round-robin.
+        Retorna: {(copa_id, team_id): {campo: valor}}, donde las claves
+        ('head_to_head', id_rival, campo) alimentan la matriz de encuentros directos.
+        """
+        return standings_core.standings_contributions(self._get_played_tuples(round_robin_only=True))
+
+    def _get_team_contributions(self):
+        """
+        Aporte de los partidos jugados (todas las etapas) a las estadísticas
+        de cada equipo.
+        Retorna: {team_id: {campo: valor}}
+        """
+        return standings_core.team_contributions(self._get_played_tuples())
+
+    @api.model
+    def _diff_standings_contributions(self, old, new):
+        """Diferencia (nuevo - anterior) entre dos aportes (tabla o equipos)"""
+        return standings_core.diff(old, new)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(BeiscoolMatch, self).create(vals_list)
+        Standings = self.env['beiscool.standings']
+        Standings._queue_delta(records._get_standings_contributions())
+        Standings._queue_team_delta(records._get_team_contributions())
+        records.copa_id._bump_public_version()
+        self._trigger_calendar_sync()
+        return records
 
     def write(self, vals):
         """Override write to update standings when match changes"""
-        result = super(BeiscoolMatch, self).write(vals)
+        # El evento de calendario se actualiza después, por lotes
+        if CALENDAR_TRIGGER_FIELDS.intersection(vals):
+            vals = dict(vals, calendar_sync_needed=True)
+            self._trigger_calendar_sync()
+        
+        # La página pública de la copa cambia (también la nueva, si se mueve el partido)
+        self.copa_id._bump_public_version()
+        if not STANDINGS_TRIGGER_FIELDS.intersection(vals):
+            return super(BeiscoolMatch, self).write(vals)
         
-        # Si se actualizó el marcador o el estado, recalcular standings
-        if 'home_runs' in vals or 'away_runs' in vals or 'state' in vals:
-            for record in self:
-                if record.copa_id and record.state == 'played':
-                    record.copa_id._compute_standings()
+        # Ajustar solo las filas de los equipos afectados con la diferencia
+        # entre el aporte anterior y el nuevo de cada partido. La diferencia
+        # se acumula y se aplica una sola vez por transacción.
+        old = self._get_standings_contributions()
+        old_teams = self._get_team_contributions()
+        result = super(BeiscoolMatch, self).write(vals)
+        Standings = self.env['beiscool.standings']
+        Standings._queue_delta(
+            self._diff_standings_contributions(old, self._get_standings_contributions())
+        )
+        Standings._queue_team_delta(
+            self._diff_standings_contributions(old_teams, self._get_team_contributions())
+        )
+        if 'copa_id' in vals:
+            self.copa_id._bump_public_version()
         
         return result
+
+    def unlink(self):
+        self.copa_id._bump_public_version()
+        old = self._get_standings_contributions()
+        old_teams = self._get_team_contributions()
+        events = self.calendar_event_id
+        result = super(BeiscoolMatch, self).unlink()
+        events.sudo().with_context(CALENDAR_EVENT_CONTEXT).unlink()
+        Standings = self.env['beiscool.standings']
+        Standings._queue_delta(self._diff_standings_contributions(old, {}))
+        Standings._queue_team_delta(self._diff_standings_contributions(old_teams, {}))
+        return result
+
+    # ============================================
+    # CALENDARIO DE ODOO
+    # ============================================
+
+    @api.model
+    def _trigger_calendar_sync(self):
+        """Despierta el cron de sincronización una sola vez por transacción"""
+        data = self.env.cr.precommit.data
+        if data.get('beiscool.match.calendar_sync'):
+            return
+        data['beiscool.match.calendar_sync'] = True
+        cron = self.env.ref('beiscool.ir_cron_beiscool_calendar_sync', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    def _mark_calendar_sync_needed(self):
+        """Marca los eventos para sincronizar sin pasar por write (no cambia la página pública)"""
+        if not self.ids:
+            return
+        self.env.cr.execute(
+            "UPDATE beiscool_match SET calendar_sync_needed = true WHERE id IN %s",
+            [tuple(self.ids)],
+        )
+        self.invalidate_recordset(['calendar_sync_needed'])
+        self._trigger_calendar_sync()
+
+    @api.model
+    def _cron_sync_calendar_events(self):
+        """Sincroniza los partidos modificados en lotes de CALENDAR_SYNC_BATCH, con commit por lote"""
+        while True:
+            matches = self.search([
+                ('calendar_sync_needed', '=', True),
+                ('copa_id.calendar_sync', '=', True),
+            ], limit=CALENDAR_SYNC_BATCH, order='id')
+            if not matches:
+                return
+            matches._sync_calendar_events()
+            self.env.cr.commit()
+
+    def _sync_calendar_events(self):
+        """
+        Sincroniza los eventos de calendario de los partidos:
+        - un create para todos los partidos sin evento
+        - write solo de los eventos cuyos valores cambiaron
+        - un unlink para los eventos de partidos cancelados o sin fecha
+        Los asistentes son los capitanes de ambos equipos y el árbitro.
+        La marca de pendiente se limpia solo en los partidos que no se
+        modificaron durante la sincronización (write_date como marca de agua).
+        """
+        matches = self.exists()
+        if not matches:
+            return
+        Event = self.env['calendar.event'].sudo().with_context(CALENDAR_EVENT_CONTEXT)
+        
+        # Marca de agua leída de la base (valor exacto, con microsegundos)
+        matches.flush_recordset()
+        self.env.cr.execute(
+            "SELECT id, write_date FROM beiscool_match WHERE id IN %s", [tuple(matches.ids)],
+        )
+        watermarks = dict(self.env.cr.fetchall())
+        
+        # Contactos de los asistentes, creados en bloque la primera vez
+        (matches.home_team_id.captain_id | matches.away_team_id.captain_id)._ensure_partners()
+        matches.referee_id._ensure_partners()
+        
+        obsolete = matches.filtered(lambda match: match.state == 'cancelled' or not match.match_date)
+        obsolete_events = obsolete.calendar_event_id
+        to_create = (matches - obsolete).filtered(lambda match: not match.calendar_event_id)
+        to_update = matches - obsolete - to_create
+        
+        events = Event.create([match._prepare_calendar_event_values() for match in to_create])
+        
+        for match in to_update:
+            changes = match._get_calendar_event_changes(match._prepare_calendar_event_values())
+            if changes:
+                match.calendar_event_id.sudo().with_context(CALENDAR_EVENT_CONTEXT).write(changes)
+        
+        obsolete_events.sudo().with_context(CALENDAR_EVENT_CONTEXT).unlink()
+        
+        # Enlaces y marcas por SQL: no es una modificación del partido
+        self.flush_model(['calendar_event_id', 'calendar_sync_needed'])
+        cr = self.env.cr
+        if to_create:
+            cr.execute("""
+                UPDATE beiscool_match AS m
+                   SET calendar_event_id = v.event_id
+                  FROM unnest(%s::int[], %s::int[]) AS v(match_id, event_id)
+                 WHERE m.id = v.match_id
+            """, [to_create.ids, events.ids])
+        if obsolete_events:
+            cr.execute(
+                "UPDATE beiscool_match SET calendar_event_id = NULL WHERE id IN %s",
+                [tuple(obsolete.ids)],
+            )
+        cr.execute("""
+            UPDATE beiscool_match AS m
+               SET calendar_sync_needed = false
+              FROM unnest(%s::int[], %s::timestamp[]) AS v(match_id, write_date)
+             WHERE m.id = v.match_id AND m.write_date = v.write_date
+        """, [list(watermarks), list(watermarks.values())])
+        matches.invalidate_recordset(['calendar_event_id', 'calendar_sync_needed'])
+        return events
+
+    def _prepare_calendar_event_values(self):
+        """Valores del evento de calendario del partido"""
+        self.ensure_one()
+        duration = self.copa_id.game_duration or DEFAULT_GAME_DURATION
+        partners = (
+            self.home_team_id.captain_id.partner_id
+            | self.away_team_id.captain_id.partner_id
+            | self.referee_id.partner_id
+        )
+        start = self._get_match_date_utc()
+        return {
+            'name': '%s: %s vs %s (%s)' % (
+                self.name, self.home_team_id.name, self.away_team_id.name, self.copa_id.name),
+            'start': start,
+            'stop': start + timedelta(minutes=round(duration * 60)),
+            'location': self.venue_id.name or self.copa_id.location or False,
+            'partner_ids': [Command.set(partners.ids)],
+            'res_model_id': self.env['ir.model']._get_id(self._name),
+            'res_id': self.id,
+        }
+
+    def _get_match_date_utc(self):
+        """
+        match_date es la hora local de la copa (los horarios se asignan sin
+        conversión de zona); calendar.event espera UTC.
+        """
+        self.ensure_one()
+        local = pytz.timezone(self.copa_id.tz or 'UTC').localize(self.match_date)
+        return local.astimezone(pytz.utc).replace(tzinfo=None)
+
+    def _get_calendar_event_changes(self, values):
+        """Valores que difieren del evento actual (no se reescribe lo que no cambió)"""
+        event = self.calendar_event_id
+        changes = {}
+        for name, value in values.items():
+            if name == 'partner_ids':
+                if set(event.partner_ids.ids) != set(value[0][2]):
+                    changes[name] = value
+            elif name == 'res_model_id':
+                if event.res_model_id.id != value:
+                    changes[name] = value
+            elif (event[name] or False) != (value or False):
+                changes[name] = value
+        return changes
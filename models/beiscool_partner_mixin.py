@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict
+
+from odoo import models, fields, tools
+
+
+class BeiscoolPartnerMixin(models.AbstractModel):
+    _name = 'beiscool.partner.mixin'
+    _description = 'Contacto para Invitaciones de Calendario'
+
+    # Los modelos que heredan este mixin definen name, email y phone
+    partner_id = fields.Many2one(
+        'res.partner',
+        string='Contacto',
+        ondelete='set null',
+        copy=False,
+        help='Contacto usado como asistente en los eventos de calendario de los partidos',
+    )
+
+    def _ensure_partners(self):
+        """
+        Contactos de los registros con correo: reutiliza los contactos
+        existentes por correo normalizado y crea los que faltan en un solo
+        create. Retorna los contactos de todos los registros.
+        """
+        missing = self.filtered(lambda record: not record.partner_id and record.email)
+        if not missing:
+            return self.partner_id
+        
+        Partner = self.env['res.partner'].sudo()
+        records_by_email = defaultdict(lambda: self.browse())
+        for record in missing:
+            email = tools.email_normalize(record.email)
+            if email:
+                records_by_email[email] |= record
+        
+        partners_by_email = {}
+        for partner in Partner.search([('email_normalized', 'in', list(records_by_email))], order='id'):
+            partners_by_email.setdefault(partner.email_normalized, partner)
+        new_emails = [email for email in records_by_email if email not in partners_by_email]
+        created = Partner.create([{
+            'name': records_by_email[email][0].name,
+            'email': records_by_email[email][0].email,
+            'phone': records_by_email[email][0].phone,
+        } for email in new_emails])
+        partners_by_email.update(zip(new_emails, created))
+        
+        for email, records in records_by_email.items():
+            records.write({'partner_id': partners_by_email[email].id})
+        return self.partner_id
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+from contextlib import contextmanager
+from datetime import timedelta
+import logging
+import random
+import threading
+import time
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+# Parámetros del sistema (ir.config_parameter) que controlan la instrumentación
+PERF_ENABLED_PARAM = 'beiscool.perf.enabled'
+PERF_SAMPLE_RATE_PARAM = 'beiscool.perf.sample_rate'
+PERF_RETENTION_DAYS_PARAM = 'beiscool.perf.retention_days'
+
+# Fases medidas además del total y del SQL
+PERF_PHASES = ('compute', 'render')
+
+
+class BeiscoolPerfProbe:
+    """
+    Medición de un punto de entrada (ruta o acción): tiempo total, consultas
+    SQL y su tiempo, y el tiempo de las fases compute y render.
+
+    Uso:
+        with BeiscoolPerfProbe(env, 'copa_page', copa_id=copa.id) as probe:
+            with probe.phase('compute'):
+                values = ...
+            with probe.phase('render'):
+                response = ...
+            probe.attach(response)
+
+    Si la instrumentación está apagada (beiscool.perf.enabled) no mide
+    nada. Si está encendida agrega el encabezado Server-Timing a la
+    respuesta adjunta y guarda una muestra con la tasa configurada, en un
+    cursor propio para no depender de la transacción medida.
+    """
+
+    def __init__(self, env, name, copa_id=False, target=False):
+        self.env = env
+        self.name = name
+        self.copa_id = copa_id
+        self.target = target
+        self.enabled = env['beiscool.perf.sample']._is_enabled()
+        self.phases = dict.fromkeys(PERF_PHASES, 0.0)
+        self.response = None
+
+    def _sql_counters(self):
+        """(consultas del cursor, segundos de SQL del hilo si Odoo los lleva)"""
+        thread = threading.current_thread()
+        return self.env.cr.sql_log_count, getattr(thread, 'query_time', None)
+
+    def __enter__(self):
+        if self.enabled:
+            self.start = time.perf_counter()
+            self.start_queries, self.start_query_time = self._sql_counters()
+        return self
+
+    @contextmanager
+    def phase(self, name):
+        """Contexto que suma su duración a la fase name"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - start
+
+    def attach(self, response):
+        """Respuesta que recibirá el encabezado Server-Timing"""
+        self.response = response
+        return response
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self.enabled or exc_type is not None:
+            return
+        duration = time.perf_counter() - self.start
+        queries, query_time = self._sql_counters()
+        values = {
+            'name': self.name,
+            'copa_id': self.copa_id or False,
+            'target': self.target or False,
+            'duration': duration * 1000,
+            'query_count': queries - self.start_queries,
+            'query_time': (query_time - self.start_query_time) * 1000
+                if query_time is not None and self.start_query_time is not None else 0.0,
+            'compute_time': self.phases['compute'] * 1000,
+            'render_time': self.phases['render'] * 1000,
+        }
+        if self.response is not None and hasattr(self.response, 'headers'):
+            self.response.headers['Server-Timing'] = self._server_timing(values)
+        self.env['beiscool.perf.sample']._store_sample(values)
+
+    @staticmethod
+    def _server_timing(values):
+        return ', '.join((
+            'sql;dur=%.1f;desc="%s consultas"' % (values['query_time'], values['query_count']),
+            'compute;dur=%.1f' % values['compute_time'],
+            'render;dur=%.1f' % values['render_time'],
+            'total;dur=%.1f' % values['duration'],
+        ))
+
+
+class BeiscoolPerfSample(models.Model):
+    _name = 'beiscool.perf.sample'
+    _description = 'Muestra de Rendimiento'
+    _order = 'create_date desc, id desc'
+
+    name = fields.Char(
+        string='Punto de Entrada',
+        required=True,
+        index=True,
+    )
+
+    copa_id = fields.Many2one(
+        'beiscool.copa',
+        string='Copa',
+        ondelete='set null',
+        index='btree_not_null',
+    )
+
+    target = fields.Char(
+        string='Registro',
+        help='Registro medido cuando no es la copa, por ejemplo beiscool.team,42',
+    )
+
+    duration = fields.Float(
+        string='Duración (ms)',
+        aggregator='avg',
+    )
+
+    query_count = fields.Integer(
+        string='Consultas SQL',
+        aggregator='avg',
+    )
+
+    query_time = fields.Float(
+        string='Tiempo SQL (ms)',
+        aggregator='avg',
+    )
+
+    compute_time = fields.Float(
+        string='Tiempo de Cálculo (ms)',
+        aggregator='avg',
+    )
+
+    render_time = fields.Float(
+        string='Tiempo de Render (ms)',
+        aggregator='avg',
+    )
+
+    @api.model
+    def _is_enabled(self):
+        """Instrumentación encendida (parámetro en caché, sin consulta por petición)"""
+        return self.env['ir.config_parameter'].sudo().get_param(PERF_ENABLED_PARAM) in ('1', 'True', 'true')
+
+    @api.model
+    def _get_sample_rate(self):
+        try:
+            rate = float(self.env['ir.config_parameter'].sudo().get_param(PERF_SAMPLE_RATE_PARAM, '1.0'))
+        except ValueError:
+            rate = 1.0
+        return min(max(rate, 0.0), 1.0)
+
+    @api.model
+    def _store_sample(self, values):
+        """
+        Guarda una muestra según la tasa configurada, en un cursor propio:
+        la muestra sobrevive aunque la transacción medida se revierta y no
+        escribe en cursores de solo lectura.
+        """
+        if random.random() >= self._get_sample_rate():
+            return
+        try:
+            with self.env.registry.cursor() as cr:
+                self.with_env(self.env(cr=cr, su=True)).create(values)
+        except Exception:
+            _logger.warning('No se pudo guardar la muestra de rendimiento %s', values['name'], exc_info=True)
+
+    @api.autovacuum
+    def _gc_old_samples(self):
+        """Elimina las muestras más antiguas que los días de retención"""
+        try:
+            days = int(self.env['ir.config_parameter'].sudo().get_param(PERF_RETENTION_DAYS_PARAM, '30'))
+        except ValueError:
+            days = 30
+        limit_date = fields.Datetime.now() - timedelta(days=days)
+        self.sudo().search([('create_date', '<', limit_date)]).unlink()
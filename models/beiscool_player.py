@@ -2,10 +2,14 @@
 
 from odoo import models, fields, api
 
+# Campos que no aparecen en las páginas públicas (no invalidan su caché)
+PRIVATE_FIELDS = {'partner_id'}
+
 
 class BeiscoolPlayer(models.Model):
     _name = 'beiscool.player'
     _description = 'Jugador de Béisbol'
+    _inherit = ['beiscool.image.mixin', 'beiscool.partner.mixin']
     _order = 'name'
 
     name = fields.Char(
@@ -19,15 +23,10 @@ class BeiscoolPlayer(models.Model):
         size=100,
     )
 
-    image = fields.Binary(
-        string='Imagen',
-        attachment=True,
-    )
-
-    image_medium = fields.Binary(
+    # image, image_128, image_256 e image_512 vienen de beiscool.image.mixin
+    image_medium = fields.Image(
         string='Imagen Mediana',
-        attachment=True,
-        related='image',
+        related='image_256',
     )
 
     team_ids = fields.Many2many(
@@ -71,3 +70,24 @@ class BeiscoolPlayer(models.Model):
     def _compute_display_name(self):
         for record in self:
             record.display_name = record.name
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(BeiscoolPlayer, self).create(vals_list)
+        # Cambian la cantidad de jugadores y los capitanes de sus copas
+        records.team_ids.copa_id._bump_public_version()
+        return records
+
+    def write(self, vals):
+        if set(vals) <= PRIVATE_FIELDS:
+            return super(BeiscoolPlayer, self).write(vals)
+        # Los capitanes y la cantidad de jugadores aparecen en la página de la copa
+        self.team_ids.copa_id._bump_public_version()
+        result = super(BeiscoolPlayer, self).write(vals)
+        if 'team_ids' in vals:
+            self.team_ids.copa_id._bump_public_version()
+        return result
+
+    def unlink(self):
+        self.team_ids.copa_id._bump_public_version()
+        return super(BeiscoolPlayer, self).unlink()
@@ -2,10 +2,13 @@
 
 from odoo import models, fields, api
 
+from .beiscool_player import PRIVATE_FIELDS
+
 
 class BeiscoolReferee(models.Model):
     _name = 'beiscool.referee'
     _description = 'Árbitro de Béisbol'
+    _inherit = ['beiscool.image.mixin', 'beiscool.partner.mixin']
     _order = 'name'
 
     name = fields.Char(
@@ -24,9 +27,11 @@ class BeiscoolReferee(models.Model):
         size=200,
     )
 
-    image = fields.Binary(
+    # Variantes image_128, image_256 e image_512 en beiscool.image.mixin
+    image = fields.Image(
         string='Foto',
-        attachment=True,
+        max_width=1920,
+        max_height=1920,
     )
 
     email = fields.Char(
@@ -60,3 +65,18 @@ class BeiscoolReferee(models.Model):
         string='Activo',
         default=True,
     )
+
+    def _get_copas(self):
+        """Copas en las que participan los árbitros"""
+        return self.env['beiscool.copa'].search([('referee_ids', 'in', self.ids)])
+
+    def write(self, vals):
+        if set(vals) <= PRIVATE_FIELDS:
+            return super(BeiscoolReferee, self).write(vals)
+        result = super(BeiscoolReferee, self).write(vals)
+        self._get_copas()._bump_public_version()
+        return result
+
+    def unlink(self):
+        self._get_copas()._bump_public_version()
+        return super(BeiscoolReferee, self).unlink()
@@ -1,12 +1,28 @@
 # -*- coding: utf-8 -*-
 
+from collections import defaultdict
+import logging
+
 from odoo import models, fields, api
 
+from ..core import standings as standings_core
+from ..core import tiebreak
+from ..core.standings import STANDINGS_COUNTERS
+from .beiscool_perf_sample import BeiscoolPerfProbe
+
+_logger = logging.getLogger(__name__)
+
 
 class BeiscoolStandings(models.Model):
     _name = 'beiscool.standings'
     _description = 'Tabla de Posiciones'
-    _order = 'matches_won desc, run_differential desc, runs_scored desc'
+    _order = 'position, matches_won desc, run_differential desc, runs_scored desc'
+
+    # El índice único (copa_id, team_id) también sirve las búsquedas por copa
+    _sql_constraints = [
+        ('copa_team_uniq', 'unique(copa_id, team_id)',
+         'Un equipo solo puede tener una fila en la tabla de posiciones de cada copa.'),
+    ]
 
     copa_id = fields.Many2one(
         'beiscool.copa',
@@ -19,6 +35,7 @@ class BeiscoolStandings(models.Model):
         'beiscool.team',
         string='Equipo',
         required=True,
+        index=True,
     )
 
     matches_played = fields.Integer(
@@ -56,39 +73,240 @@ class BeiscoolStandings(models.Model):
         default=0,
     )
 
-    # Campos calculados para ordenamiento
+    # Posición en la tabla, asignada en bloque por _assign_positions
     position = fields.Integer(
         string='Posición',
-        compute='_compute_position',
-        store=True,
+        default=0,
+        readonly=True,
+    )
+
+    # Fila de la matriz de encuentros directos de la copa
+    head_to_head = fields.Json(
+        string='Encuentros Directos',
+        readonly=True,
     )
 
-    @api.depends('copa_id.standings_ids', 'matches_won', 'run_differential', 'runs_scored')
-    def _compute_position(self):
-        """Calcula la posición del equipo en la tabla"""
-        for record in self:
-            if not record.copa_id:
-                record.position = 0
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(BeiscoolStandings, self).create(vals_list)
+        records.copa_id._bump_public_version()
+        return records
+
+    def write(self, vals):
+        result = super(BeiscoolStandings, self).write(vals)
+        self.copa_id._bump_public_version()
+        return result
+
+    # ============================================
+    # POSICIONES
+    # ============================================
+
+    @api.model
+    def _assign_positions(self, copa_ids):
+        """
+        Asigna la posición de todas las filas de las copas con un solo
+        ordenamiento por copa (ver core.tiebreak). Los empates exactos
+        comparten posición (1, 2, 2, 4). Solo se escriben las filas cuya
+        posición cambió, agrupadas por valor.
+        """
+        if not copa_ids:
+            return
+        
+        rows_by_copa = defaultdict(list)
+        current = {}
+        for row in self.search_read(
+            [('copa_id', 'in', list(copa_ids))],
+            ['copa_id', 'team_id', 'matches_won', 'run_differential',
+             'runs_scored', 'head_to_head', 'position'],
+            load=None,
+        ):
+            current[row['id']] = row['position']
+            rows_by_copa[row['copa_id']].append(row)
+        
+        changed = defaultdict(list)
+        for rows in rows_by_copa.values():
+            positions = tiebreak.positions(self._to_tiebreak_rows(rows))
+            for row_id, position in positions.items():
+                if current[row_id] != position:
+                    changed[position].append(row_id)
+        
+        for position, row_ids in changed.items():
+            self.browse(row_ids).write({'position': position})
+
+    @api.model
+    def _to_tiebreak_rows(self, rows):
+        """Filas leídas con search_read como tuplas de core.tiebreak"""
+        return [
+            (row['id'], row['team_id'], row['matches_won'], row['run_differential'],
+             row['runs_scored'], row['head_to_head'])
+            for row in rows
+        ]
+
+    # ============================================
+    # ACTUALIZACIÓN INCREMENTAL
+    # ============================================
+
+    @api.model
+    def _prepare_counters_values(self, counters):
+        """Valores a escribir a partir de los contadores, con los campos derivados"""
+        return standings_core.counters_values(counters)
+
+    @api.model
+    def _merge_head_to_head(self, head_to_head, values):
+        """Suma a una fila de la matriz los contadores ('head_to_head', rival, campo)"""
+        return standings_core.merge_head_to_head(head_to_head, values)
+
+    @api.model
+    def _apply_delta(self, delta):
+        """
+        Ajusta la tabla de posiciones con una diferencia de contadores.
+        delta: {(copa_id, team_id): {campo: diferencia}}
+        Solo se escriben las filas de los equipos afectados. Si a una copa
+        le falta la fila de un equipo, la diferencia no sirve como valor
+        inicial (puede ser negativa o parcial): esa copa se reconstruye
+        completa, estadísticas de sus equipos incluidas.
+        Retorna las copas reconstruidas.
+        """
+        delta = {
+            key: values for key, values in delta.items()
+            if any(values.values())
+        }
+        if not delta:
+            return self.env['beiscool.copa']
+
+        rows = self.search([
+            ('copa_id', 'in', list({copa_id for copa_id, _team_id in delta})),
+            ('team_id', 'in', list({team_id for _copa_id, team_id in delta})),
+        ])
+        rows_by_key = {(row.copa_id.id, row.team_id.id): row for row in rows}
+
+        rebuild_ids = {copa_id for copa_id, team_id in delta if (copa_id, team_id) not in rows_by_key}
+        if rebuild_ids:
+            _logger.info('Tabla de posiciones sin filas para la diferencia: se reconstruyen las copas %s',
+                         sorted(rebuild_ids))
+
+        for (copa_id, team_id), values in delta.items():
+            if copa_id in rebuild_ids:
                 continue
-            
-            # Obtener todos los standings de la copa ordenados
-            all_standings = record.copa_id.standings_ids.sorted(
-                key=lambda x: (x.matches_won, x.run_differential, x.runs_scored),
-                reverse=True
-            )
-            
-            # Encontrar la posición de este equipo
-            position = 1
-            for standing in all_standings:
-                if standing == record:
-                    record.position = position
-                    break
-                position += 1
+            row = rows_by_key[copa_id, team_id]
+            counters = {
+                name: row[name] + values.get(name, 0)
+                for name in STANDINGS_COUNTERS
+            }
+            vals = self._prepare_counters_values(counters)
+            vals['head_to_head'] = self._merge_head_to_head(row.head_to_head, values)
+            row.write(vals)
+
+        self._assign_positions({copa_id for copa_id, _team_id in delta} - rebuild_ids)
+        rebuilt = self.env['beiscool.copa'].browse(rebuild_ids).exists()
+        if rebuilt:
+            rebuilt._compute_standings()
+        return rebuilt
+
+    # ============================================
+    # ACTUALIZACIÓN DIFERIDA POR TRANSACCIÓN
+    # ============================================
+
+    def _get_pending_standings(self):
+        """
+        Trabajo pendiente de la transacción actual. Se registra un único
+        precommit que lo aplica antes del commit (o en cr.flush()).
+        """
+        data = self.env.cr.precommit.data
+        pending = data.get('beiscool.standings.pending')
+        if pending is None:
+            pending = data['beiscool.standings.pending'] = {
+                'delta': defaultdict(lambda: defaultdict(int)),
+                'team_delta': defaultdict(lambda: defaultdict(int)),
+                'rebuild': set(),
+            }
+            self.env.cr.precommit.add(self.sudo()._flush_pending_standings)
+        return pending
+
+    @api.model
+    def _queue_delta(self, delta):
+        """Acumula una diferencia de contadores para aplicarla una sola vez"""
+        if not any(any(values.values()) for values in delta.values()):
+            return
+        pending = self._get_pending_standings()['delta']
+        for key, values in delta.items():
+            for field_name, value in values.items():
+                pending[key][field_name] += value
+
+    @api.model
+    def _queue_team_delta(self, delta):
+        """Acumula una diferencia de las estadísticas de equipos (beiscool.team)"""
+        if not any(any(values.values()) for values in delta.values()):
+            return
+        pending = self._get_pending_standings()['team_delta']
+        for team_id, values in delta.items():
+            for field_name, value in values.items():
+                pending[team_id][field_name] += value
+
+    @api.model
+    def _queue_rebuild(self, copa_ids):
+        """Marca copas para una reconstrucción completa al final de la transacción"""
+        if copa_ids:
+            self._get_pending_standings()['rebuild'].update(copa_ids)
+
+    @api.model
+    def _flush_pending_standings(self):
+        """
+        Aplica el trabajo acumulado: una reconstrucción por copa marcada y
+        una sola actualización por equipo afectado (tabla y estadísticas
+        del equipo) en el resto.
+        """
+        pending = self.env.cr.precommit.data.pop('beiscool.standings.pending', None)
+        if not pending:
+            return
+        rebuild = self.env['beiscool.copa'].browse(pending['rebuild']).exists()
+        # Las copas reconstruidas ya incluyen sus diferencias pendientes
+        delta = {
+            key: values for key, values in pending['delta'].items()
+            if key[0] not in rebuild.ids
+        }
+        rebuilt_team_ids = set(rebuild.team_ids.ids)
+        team_delta = {
+            team_id: values for team_id, values in pending['team_delta'].items()
+            if team_id not in rebuilt_team_ids
+        }
+        if not delta and not team_delta and not rebuild:
+            return
+        copa_ids = {copa_id for copa_id, _team_id in delta} | set(rebuild.ids)
+        with BeiscoolPerfProbe(
+            self.env, 'standings_flush',
+            copa_id=len(copa_ids) == 1 and next(iter(copa_ids)),
+        ) as probe, probe.phase('compute'):
+            rebuilt = self._apply_delta(delta)
+            # Las copas reconstruidas ya recalcularon las estadísticas de sus equipos
+            rebuilt_team_ids = set(rebuilt.team_ids.ids)
+            self.env['beiscool.team']._apply_match_delta({
+                team_id: values for team_id, values in team_delta.items()
+                if team_id not in rebuilt_team_ids
+            })
+            if rebuild:
+                rebuild._compute_standings()
+            # Odoo no vuelve a hacer flush después de los precommit: sin esto
+            # las escrituras del ORM quedarían en caché y no llegarían al commit
+            self.env.flush_all()
 
     # ============================================
     # MÉTODOS DE DESEMPATE
     # ============================================
 
+    def _get_head_to_head_counters(self, other_team_id):
+        """Contadores del encuentro directo contra otro equipo (lectura de la matriz)"""
+        self.ensure_one()
+        return tiebreak.head_to_head_counters(self.head_to_head, other_team_id)
+
+    def _get_mini_table_key(self, team_ids):
+        """
+        Criterios de la mini-tabla formada solo por los partidos contra
+        team_ids: victorias y diferencia de carreras entre los empatados.
+        """
+        self.ensure_one()
+        return tiebreak.mini_table_key(self.team_id.id, self.head_to_head, team_ids)
+
     def get_head_to_head_result(self, other_team):
         """
         Obtiene el resultado del encuentro directo entre dos equipos.
@@ -99,25 +317,14 @@ class BeiscoolStandings(models.Model):
         if not self.copa_id or not other_team:
             return 0
         
-        # Obtener partidos jugados entre estos dos equipos
-        matches = self.copa_id.match_ids.filtered(
-            lambda m: m.state == 'played' and
-            ((m.home_team_id == self.team_id and m.away_team_id == other_team) or
-             (m.home_team_id == other_team and m.away_team_id == self.team_id))
-        )
-        
-        if not matches:
-            return 0
-        
-        # Contar victorias
-        wins_self = 0
-        wins_other = 0
-        
-        for match in matches:
-            if match.winner_id == self.team_id:
-                wins_self += 1
-            elif match.winner_id == other_team:
-                wins_other += 1
+        # Un empate no es victoria de nadie: las victorias del rival se leen
+        # de su propia fila, no de los partidos jugados menos los ganados
+        other = self.search([
+            ('copa_id', '=', self.copa_id.id),
+            ('team_id', '=', other_team.id),
+        ], limit=1)
+        wins_self = self._get_head_to_head_counters(other_team.id)['matches_won']
+        wins_other = other._get_head_to_head_counters(self.team_id.id)['matches_won'] if other else 0
         
         if wins_self > wins_other:
             return 1
@@ -133,8 +340,13 @@ class BeiscoolStandings(models.Model):
         """
         self.ensure_one()
         
+        team_ids = [standing.team_id.id for standing in other_standings_list]
+        mini_won, mini_run_differential = self._get_mini_table_key(team_ids)
+        
         return (
             -self.matches_won,  # Más partidos ganados
+            -mini_won,  # Más victorias entre los empatados
+            -mini_run_differential,  # Mayor diferencia entre los empatados
             -self.run_differential,  # Mayor diferencia de carreras
             -self.runs_scored,  # Más carreras anotadas
         )
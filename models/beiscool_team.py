@@ -2,10 +2,20 @@
 
 from odoo import models, fields, api
 
+# Estadísticas del equipo mantenidas de forma incremental
+TEAM_COUNTERS = (
+    'matches_played',
+    'matches_won',
+    'matches_lost',
+    'runs_scored',
+    'runs_allowed',
+)
+
 
 class BeiscoolTeam(models.Model):
     _name = 'beiscool.team'
     _description = 'Equipo de Béisbol'
+    _inherit = ['beiscool.image.mixin']
     _order = 'name'
 
     name = fields.Char(
@@ -14,15 +24,10 @@ class BeiscoolTeam(models.Model):
         size=200,
     )
 
-    image = fields.Binary(
-        string='Imagen',
-        attachment=True,
-    )
-
-    image_medium = fields.Binary(
+    # image, image_128, image_256 e image_512 vienen de beiscool.image.mixin
+    image_medium = fields.Image(
         string='Imagen Mediana',
-        attachment=True,
-        related='image',
+        related='image_256',
     )
 
     player_quantity = fields.Integer(
@@ -49,6 +54,7 @@ class BeiscoolTeam(models.Model):
         'beiscool.copa',
         string='Copa',
         ondelete='cascade',
+        index=True,
     )
 
     color = fields.Integer(
@@ -56,17 +62,36 @@ class BeiscoolTeam(models.Model):
         default=0,
     )
 
-    # Campos calculados
+    # Estadísticas del equipo (todas las etapas), mantenidas con
+    # actualizaciones incrementales desde beiscool.match
     matches_played = fields.Integer(
         string='Partidos Jugados',
-        compute='_compute_team_stats',
-        store=True,
+        default=0,
+        readonly=True,
     )
 
     matches_won = fields.Integer(
         string='Partidos Ganados',
-        compute='_compute_team_stats',
-        store=False,
+        default=0,
+        readonly=True,
+    )
+
+    matches_lost = fields.Integer(
+        string='Partidos Perdidos',
+        default=0,
+        readonly=True,
+    )
+
+    runs_scored = fields.Integer(
+        string='Carreras Anotadas',
+        default=0,
+        readonly=True,
+    )
+
+    runs_allowed = fields.Integer(
+        string='Carreras Permitidas',
+        default=0,
+        readonly=True,
     )
 
     @api.depends('player_ids')
@@ -74,21 +99,100 @@ class BeiscoolTeam(models.Model):
         for record in self:
             record.player_quantity = len(record.player_ids)
 
-    @api.depends('copa_id', 'copa_id.match_ids')
-    def _compute_team_stats(self):
-        for record in self:
-            if not record.copa_id:
-                record.matches_played = 0
-                record.matches_won = 0
-                continue
-            
-            matches = record.copa_id.match_ids.filtered(
-                lambda m: (m.home_team_id == record or m.away_team_id == record) 
-                and m.state == 'played'
-            )
-            
-            record.matches_played = len(matches)
-            record.matches_won = len(matches.filtered(lambda m: m.winner_id == record))
+    # ============================================
+    # ESTADÍSTICAS INCREMENTALES
+    # ============================================
+
+    @api.model
+    def _apply_match_delta(self, delta):
+        """
+        Ajusta las estadísticas de los equipos con una diferencia de contadores.
+        delta: {team_id: {campo: diferencia}}
+        """
+        delta = {
+            team_id: values for team_id, values in delta.items()
+            if any(values.values())
+        }
+        for team in self.browse(list(delta)).exists():
+            values = delta[team.id]
+            team.write({
+                name: team[name] + values.get(name, 0)
+                for name in TEAM_COUNTERS
+            })
+
+    def _recompute_match_counters(self):
+        """
+        Reconstrucción de las estadísticas de los equipos con una sola
+        consulta agrupada (lado local UNION ALL lado visitante).
+        """
+        if not self.ids:
+            return
+        
+        self.env['beiscool.match'].flush_model([
+            'home_team_id', 'away_team_id', 'home_runs', 'away_runs', 'state',
+        ])
+        self.env.cr.execute("""
+            SELECT sides.team_id,
+                   COUNT(*),
+                   SUM(sides.won),
+                   SUM(sides.scored),
+                   SUM(sides.allowed)
+              FROM (
+                    SELECT home_team_id AS team_id,
+                           CASE WHEN COALESCE(home_runs, 0) > COALESCE(away_runs, 0) THEN 1 ELSE 0 END AS won,
+                           COALESCE(home_runs, 0) AS scored,
+                           COALESCE(away_runs, 0) AS allowed
+                      FROM beiscool_match
+                     WHERE home_team_id IN %s AND state = 'played'
+                 UNION ALL
+                    SELECT away_team_id,
+                           CASE WHEN COALESCE(away_runs, 0) > COALESCE(home_runs, 0) THEN 1 ELSE 0 END,
+                           COALESCE(away_runs, 0),
+                           COALESCE(home_runs, 0)
+                      FROM beiscool_match
+                     WHERE away_team_id IN %s AND state = 'played'
+                   ) AS sides
+          GROUP BY sides.team_id
+        """, [tuple(self.ids), tuple(self.ids)])
+        totals = {
+            team_id: {
+                'matches_played': played,
+                'matches_won': won,
+                # Un empate cuenta como derrota
+                'matches_lost': played - won,
+                'runs_scored': scored,
+                'runs_allowed': allowed,
+            }
+            for team_id, played, won, scored, allowed in self.env.cr.fetchall()
+        }
+        
+        for team in self:
+            values = {name: totals.get(team.id, {}).get(name, 0) for name in TEAM_COUNTERS}
+            if any(team[name] != value for name, value in values.items()):
+                team.write(values)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(BeiscoolTeam, self).create(vals_list)
+        records.copa_id._bump_public_version()
+        return records
+
+    def write(self, vals):
+        # Copa anterior y nueva
+        self.copa_id._bump_public_version()
+        result = super(BeiscoolTeam, self).write(vals)
+        if 'copa_id' in vals:
+            self.copa_id._bump_public_version()
+        if 'captain_id' in vals or 'name' in vals:
+            # Cambian los asistentes o el título de los eventos de sus partidos
+            self.env['beiscool.match'].search([
+                '|', ('home_team_id', 'in', self.ids), ('away_team_id', 'in', self.ids),
+            ])._mark_calendar_sync_needed()
+        return result
+
+    def unlink(self):
+        self.copa_id._bump_public_version()
+        return super(BeiscoolTeam, self).unlink()
 
     def get_players_list(self):
         """Retorna lista de nombres de jugadores"""
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+
+WEEKDAYS = [
+    ('0', 'Lunes'),
+    ('1', 'Martes'),
+    ('2', 'Miércoles'),
+    ('3', 'Jueves'),
+    ('4', 'Viernes'),
+    ('5', 'Sábado'),
+    ('6', 'Domingo'),
+]
+
+
+class BeiscoolVenue(models.Model):
+    _name = 'beiscool.venue'
+    _description = 'Sede de Béisbol'
+    _order = 'name'
+
+    name = fields.Char(
+        string='Nombre',
+        required=True,
+        size=200,
+    )
+
+    location = fields.Char(
+        string='Dirección',
+        size=300,
+    )
+
+    field_count = fields.Integer(
+        string='Terrenos',
+        default=1,
+        help='Cantidad de terrenos en la sede: partidos que se pueden jugar a la vez',
+    )
+
+    slot_ids = fields.One2many(
+        'beiscool.venue.slot',
+        'venue_id',
+        string='Horarios',
+    )
+
+    blackout_ids = fields.One2many(
+        'beiscool.venue.blackout',
+        'venue_id',
+        string='Fechas Bloqueadas',
+    )
+
+    active = fields.Boolean(
+        string='Activo',
+        default=True,
+    )
+
+    @api.constrains('field_count')
+    def _check_field_count(self):
+        for record in self:
+            if record.field_count < 1:
+                raise ValidationError('La sede debe tener al menos un terreno.')
+
+
+class BeiscoolVenueSlot(models.Model):
+    _name = 'beiscool.venue.slot'
+    _description = 'Horario de Sede'
+    _order = 'venue_id, weekday, time_start'
+
+    venue_id = fields.Many2one(
+        'beiscool.venue',
+        string='Sede',
+        ondelete='cascade',
+        required=True,
+    )
+
+    weekday = fields.Selection(
+        WEEKDAYS,
+        string='Día',
+        required=True,
+        default='5',
+    )
+
+    time_start = fields.Float(
+        string='Desde',
+        required=True,
+        default=9.5,
+    )
+
+    time_end = fields.Float(
+        string='Hasta',
+        required=True,
+        default=14.5,
+        help='Los partidos se programan uno tras otro, según la duración '
+             'configurada en la copa, mientras terminen antes de esta hora',
+    )
+
+    @api.constrains('time_start', 'time_end')
+    def _check_times(self):
+        for record in self:
+            if not 0 <= record.time_start < record.time_end <= 24:
+                raise ValidationError('El horario debe empezar antes de terminar, dentro del mismo día.')
+
+
+class BeiscoolVenueBlackout(models.Model):
+    _name = 'beiscool.venue.blackout'
+    _description = 'Fecha Bloqueada'
+    _order = 'date'
+
+    name = fields.Char(
+        string='Motivo',
+        size=200,
+    )
+
+    date = fields.Date(
+        string='Fecha',
+        required=True,
+    )
+
+    venue_id = fields.Many2one(
+        'beiscool.venue',
+        string='Sede',
+        ondelete='cascade',
+        help='Si está vacío, la fecha se bloquea en todas las sedes de la copa',
+    )
+
+    copa_id = fields.Many2one(
+        'beiscool.copa',
+        string='Copa',
+        ondelete='cascade',
+    )
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+
+from . import test_performance
+from . import test_jobs
+from . import test_calendar
+from . import test_standings
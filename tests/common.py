@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+from datetime import date
+import time
+
+from odoo.fields import Command
+from odoo.tests.common import TransactionCase
+
+# Jugadores creados por equipo en las copas sintéticas
+PLAYERS_PER_TEAM = 3
+
+
+class BeiscoolDataMixin:
+    """Creación en lote de copas sintéticas y medición para las pruebas"""
+
+    @classmethod
+    def _create_copa(cls, team_count, players_per_team=PLAYERS_PER_TEAM, **values):
+        """
+        Copa en borrador con team_count equipos y players_per_team jugadores
+        por equipo (el primero es capitán). Sin semifinal ni final, para que
+        el calendario solo tenga el round-robin.
+        """
+        copa = cls.env['beiscool.copa'].create(dict({
+            'name': 'Copa de prueba (%s equipos)' % team_count,
+            'date_start': date(2025, 1, 4),
+            'has_semifinal': False,
+            'has_final': False,
+        }, **values))
+        teams = cls.env['beiscool.team'].create([{
+            'name': 'Equipo %04d' % index,
+            'copa_id': copa.id,
+        } for index in range(team_count)])
+        cls.env['beiscool.player'].create([{
+            'name': '%s - Jugador %s' % (team.name, number),
+            'number': number,
+            'is_captain': number == 1,
+            'team_ids': [Command.set(team.ids)],
+        } for team in teams for number in range(1, players_per_team + 1)])
+        return copa
+
+    @classmethod
+    def _result_values(cls, match):
+        """Resultado determinista y variado (incluye empates) para un partido"""
+        return {
+            'home_runs': (match.id * 7) % 11,
+            'away_runs': (match.id * 5) % 9,
+            'state': 'played',
+        }
+
+    def assertWallTime(self, ceiling, function, *args, **kwargs):
+        """Ejecuta function y falla si tarda más de ceiling segundos"""
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        self.assertLess(
+            elapsed, ceiling,
+            '%s tardó %.2fs (máximo %.2fs)' % (getattr(function, '__name__', function), elapsed, ceiling),
+        )
+        return result
+
+    def _count_queries(self, function, *args, **kwargs):
+        """Consultas SQL ejecutadas por function, incluido el trabajo diferido al commit"""
+        self.env.flush_all()
+        self.env.cr.flush()
+        count = self.cr.sql_log_count
+        function(*args, **kwargs)
+        self.env.cr.flush()
+        return self.cr.sql_log_count - count
+
+
+class BeiscoolPerformanceCase(BeiscoolDataMixin, TransactionCase):
+    """Base de las pruebas de rendimiento de la lógica de negocio"""
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from odoo.tests import tagged
+
+from ..core import scheduling
+from .common import BeiscoolPerformanceCase
+
+
+@tagged('post_install', '-at_install')
+class TestBeiscoolCalendarRegeneration(BeiscoolPerformanceCase):
+
+    def setUp(self):
+        super().setUp()
+        self.copa = self._create_copa(6)
+        self.copa.action_generate_calendar()
+        self.played = self.copa.match_ids.sorted('match_date')[:5]
+        for match in self.played:
+            match.write(self._result_values(match))
+        self.copa.action_in_progress()
+        self.played_values = self.played.read(['home_team_id', 'away_team_id', 'match_date', 'sequence'])
+
+    def assertValidCalendar(self, copa, team_count, legs=1):
+        matches = copa.match_ids.filtered(lambda match: match.stage == 'round_robin')
+        self.assertEqual(len(matches), legs * team_count * (team_count - 1) // 2)
+        pairs = Counter(frozenset((match.home_team_id.id, match.away_team_id.id)) for match in matches)
+        self.assertEqual(set(pairs.values()), {legs})
+        days = Counter(
+            (team.id, match.match_date.date())
+            for match in matches for team in match.home_team_id | match.away_team_id
+        )
+        self.assertEqual(max(days.values()), 1, 'Un equipo juega dos veces el mismo día')
+        self.assertEqual(len(set(matches.mapped('sequence'))), len(matches))
+        # Los partidos jugados no cambian
+        self.assertEqual(
+            self.played.read(['home_team_id', 'away_team_id', 'match_date', 'sequence']),
+            self.played_values,
+        )
+
+    def test_add_team(self):
+        untouched = self.copa.match_ids - self.played
+        self.env['beiscool.team'].create({'name': 'Equipo tardío', 'copa_id': self.copa.id})
+        self.copa.action_regenerate_calendar()
+        self.assertValidCalendar(self.copa, 7)
+        # Los partidos existentes se conservan: solo se agregan los del equipo nuevo
+        self.assertEqual(untouched.exists(), untouched)
+        self.assertEqual(len(self.copa.standings_ids.exists()), 7)
+
+    def test_change_rounds(self):
+        self.copa.rounds = 2
+        self.copa.action_regenerate_calendar()
+        self.assertValidCalendar(self.copa, 6, legs=2)
+        self.copa.rounds = 1
+        self.copa.action_regenerate_calendar()
+        self.assertValidCalendar(self.copa, 6)
+
+    def test_remove_team(self):
+        """Los partidos no jugados del equipo retirado se eliminan; los jugados no"""
+        team = (self.copa.team_ids - self.played.home_team_id - self.played.away_team_id)[:1] \
+            or self.copa.team_ids[-1:]
+        played_by_team = self.played.filtered(lambda match: team in match.home_team_id | match.away_team_id)
+        team.copa_id = self.env['beiscool.copa'].create({'name': 'Otra copa'})
+        self.copa.action_regenerate_calendar()
+        remaining = self.copa.match_ids.filtered(
+            lambda match: team in match.home_team_id | match.away_team_id)
+        self.assertEqual(remaining, played_by_team)
+
+    def test_extra_cancelled_match_kept(self):
+        """Un partido cancelado que sobra para su par no se elimina"""
+        match = (self.copa.match_ids - self.played)[:1]
+        cancelled = match.copy({'state': 'cancelled', 'copa_id': self.copa.id})
+        self.copa.action_regenerate_calendar()
+        self.assertTrue(cancelled.exists())
+        self.assertTrue(match.exists())
+
+
+@tagged('post_install', '-at_install')
+class TestBeiscoolReschedule(BeiscoolPerformanceCase):
+
+    def test_reschedule_washed_out_weekend(self):
+        copa = self._create_copa(8)
+        referee = self.env['beiscool.referee'].create({'name': 'Árbitro de prueba'})
+        copa.referee_ids = [(4, referee.id)]
+        copa.action_generate_calendar()
+        copa.match_ids.referee_id = referee
+        copa.action_in_progress()
+        first_day = min(copa.match_ids.mapped('match_date')).date()
+        washed = copa.match_ids.filtered(lambda match: match.match_date.date() == first_day)
+        original_dates = washed.mapped('match_date')
+        
+        wizard = self.env['beiscool.match.reschedule'].with_context(
+            active_model='beiscool.copa', active_id=copa.id,
+        ).new({'date_from': first_day, 'date_to': first_day})
+        wizard._onchange_dates()
+        self.assertEqual(wizard.match_ids._origin, washed)
+        copa._reschedule_matches(washed, wizard.after_date)
+        
+        self.assertTrue(all(match.match_date.date() > first_day for match in washed))
+        self.assertEqual(washed.mapped('original_date'), original_dates)
+        days = Counter(
+            (team.id, match.match_date.date())
+            for match in copa.match_ids for team in match.home_team_id | match.away_team_id
+        )
+        self.assertEqual(max(days.values()), 1, 'Un equipo juega dos veces el mismo día')
+        starts = sorted(copa.match_ids.mapped('match_date'))
+        self.assertEqual(len(starts), len(set(starts)), 'El árbitro tiene dos partidos a la vez')
+
+    def test_other_copa_without_venue(self):
+        """Un partido sin sede de otra copa solo ocupa a su árbitro, no los horarios de esta copa"""
+        day = date(2025, 1, 4)
+        slots = [(datetime(2025, 1, 4, 9, 30), None), (datetime(2025, 1, 4, 12, 0), None)]
+        other_copa_matches = [
+            (1, 10, 11, slots[0][0], None, 5, 2),
+            (2, 12, 13, slots[1][0], None, 5, 2),
+        ]
+        index = scheduling.OccupancyIndex(other_copa_matches, copa_id=1)
+        index.set_days([(day, slots)])
+        self.assertEqual(index.find_slot(20, 21, False), slots[0])
+        self.assertIsNone(index.find_slot(20, 21, 5))
+
+
+@tagged('post_install', '-at_install')
+class TestBeiscoolCalendarSync(BeiscoolPerformanceCase):
+
+    def test_sync_calendar_events(self):
+        # Los horarios son hora local de la copa; los eventos, UTC (Bogotá: UTC-5, sin horario de verano)
+        copa = self._create_copa(6, tz='America/Bogota')
+        for team in copa.team_ids:
+            team.captain_id = team.player_ids.filtered('is_captain')[:1]
+            team.captain_id.email = '%s@example.com' % team.name.replace(' ', '.').lower()
+        copa.action_generate_calendar()
+        copa.action_sync_calendar()
+        
+        matches = copa.match_ids
+        events = matches.calendar_event_id
+        self.assertEqual(len(events), len(matches))
+        self.assertFalse(any(matches.mapped('calendar_sync_needed')))
+        match = matches[0]
+        self.assertEqual(
+            match.calendar_event_id.partner_ids,
+            match.home_team_id.captain_id.partner_id | match.away_team_id.captain_id.partner_id,
+        )
+        
+        # Sin cambios no se reescribe ningún evento
+        self.env.flush_all()
+        write_dates = events.mapped('write_date')
+        matches._sync_calendar_events()
+        self.env.flush_all()
+        events.invalidate_recordset(['write_date'])
+        self.assertEqual(events.mapped('write_date'), write_dates)
+        
+        # Solo el partido modificado queda pendiente; el cancelado pierde su evento
+        moved, cancelled = matches[:2]
+        moved.match_date = moved.match_date + timedelta(days=7)
+        cancelled.action_cancel()
+        self.assertEqual(matches.filtered('calendar_sync_needed'), moved | cancelled)
+        cancelled_event = cancelled.calendar_event_id
+        copa.action_sync_calendar()
+        self.assertEqual(moved.calendar_event_id.start, moved.match_date + timedelta(hours=5))
+        self.assertFalse(cancelled.calendar_event_id)
+        self.assertFalse(cancelled_event.exists())
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from .common import BeiscoolPerformanceCase
+
+
+@tagged('post_install', '-at_install')
+class TestBeiscoolJobs(BeiscoolPerformanceCase):
+
+    def _process_jobs(self):
+        """Procesa la cola en la transacción de la prueba (sin commits ni rollbacks reales)"""
+        cursor_class = type(self.env.cr)
+        with patch.object(cursor_class, 'commit', lambda cr: cr.flush()), \
+                patch.object(cursor_class, 'rollback', lambda cr: None), \
+                patch('odoo.addons.beiscool.models.beiscool_copa.JOB_CHUNK_SIZE', 10):
+            self.env['beiscool.job']._process_jobs()
+
+    def test_enqueue_once_per_copa(self):
+        copa = self._create_copa(4)
+        first = self.env['beiscool.job']._enqueue(copa, 'generate_calendar')
+        second = self.env['beiscool.job']._enqueue(copa, 'generate_calendar')
+        self.assertEqual(first, second)
+        self.assertEqual(copa.job_state, 'pending')
+
+    def test_generate_calendar_job(self):
+        copa = self._create_copa(8)
+        copa.action_queue_generate_calendar()
+        self._process_jobs()
+        copa.invalidate_recordset()
+        self.assertEqual(copa.job_state, 'done')
+        self.assertEqual(copa.job_progress, 100.0)
+        self.assertEqual(len(copa.match_ids), 8 * 7 // 2)
+        self.assertEqual(len(copa.standings_ids), 8)
+        # Regenerar reemplaza los partidos por lotes
+        copa.action_queue_generate_calendar()
+        self._process_jobs()
+        copa.invalidate_recordset()
+        self.assertEqual(len(copa.match_ids), 8 * 7 // 2)
+
+    def test_failed_job(self):
+        copa = self._create_copa(4)
+        job = self.env['beiscool.job']._enqueue(copa, 'generate_calendar')
+        copa.state = 'in_progress'
+        self._process_jobs()
+        self.assertEqual(job.state, 'failed')
+        self.assertIn('Borrador', job.error)
+        with self.assertRaises(UserError):
+            copa.action_queue_generate_calendar()
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+import re
+
+from odoo.fields import Command
+from odoo.tests import HttpCase, tagged
+
+from .common import BeiscoolDataMixin, BeiscoolPerformanceCase
+
+# Tamaños de copa medidos (cantidad de equipos)
+SMALL_COPA = 8
+LARGE_COPA = 24
+
+# Presupuestos de consultas: fijo + por equipo. Con un N+1 por partido o un
+# recálculo cuadrático la copa grande (276 partidos) los supera.
+QUERY_BUDGETS = {
+    'generate_calendar': (80, 8),
+    'compute_standings': (30, 6),
+    'bulk_results': (40, 8),
+}
+
+# Consultas que una página puede agregar al pasar de la copa chica a la grande
+PAGE_QUERY_SLACK = 10
+
+# Consultas máximas de una página servida desde la caché de render
+CACHED_PAGE_QUERIES = 25
+
+# Segundos máximos por operación, con holgura para máquinas de CI lentas
+WALL_TIME_CEILINGS = {
+    'generate_calendar': 20.0,
+    'compute_standings': 10.0,
+    'bulk_results': 15.0,
+    'page': 10.0,
+}
+
+
+def query_budget(name, team_count):
+    base, per_team = QUERY_BUDGETS[name]
+    return base + per_team * team_count
+
+
+@tagged('post_install', '-at_install', 'beiscool_performance')
+class TestBeiscoolPerformance(BeiscoolPerformanceCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.copas = {
+            size: cls._create_copa(size)
+            for size in (SMALL_COPA, LARGE_COPA)
+        }
+
+    def _generate_calendar(self, copa):
+        copa.action_generate_calendar()
+        self.env.cr.flush()
+
+    def _play_all(self, copa):
+        """Carga un resultado distinto en cada partido, uno por uno"""
+        for match in copa.match_ids:
+            match.write(self._result_values(match))
+
+    def test_generate_calendar(self):
+        for size, copa in self.copas.items():
+            with self.subTest(teams=size):
+                with self.assertQueryCount(query_budget('generate_calendar', size)):
+                    self.assertWallTime(
+                        WALL_TIME_CEILINGS['generate_calendar'], self._generate_calendar, copa,
+                    )
+                self.assertEqual(len(copa.match_ids), size * (size - 1) // 2)
+                self.assertEqual(len(copa.standings_ids), size)
+
+    def test_compute_standings(self):
+        for size, copa in self.copas.items():
+            with self.subTest(teams=size):
+                self._generate_calendar(copa)
+                self._play_all(copa)
+                self.env.cr.flush()
+                with self.assertQueryCount(query_budget('compute_standings', size)):
+                    self.assertWallTime(
+                        WALL_TIME_CEILINGS['compute_standings'], copa._compute_standings,
+                    )
+                self.assertEqual(
+                    sum(copa.standings_ids.mapped('matches_played')),
+                    2 * len(copa.match_ids),
+                )
+
+    def test_bulk_results(self):
+        for size, copa in self.copas.items():
+            with self.subTest(teams=size):
+                self._generate_calendar(copa)
+                with self.assertQueryCount(query_budget('bulk_results', size)):
+                    self.assertWallTime(
+                        WALL_TIME_CEILINGS['bulk_results'], copa.match_ids.write,
+                        {'home_runs': 5, 'away_runs': 3, 'state': 'played'},
+                    )
+                self.env.cr.flush()
+                # Lo escrito en la base, no la caché del ORM
+                self.env.invalidate_all()
+                self.assertEqual(
+                    sum(copa.standings_ids.mapped('matches_won')),
+                    len(copa.match_ids),
+                )
+
+    def test_incremental_standings_match_rebuild(self):
+        """La tabla incremental coincide con la reconstrucción completa"""
+        copa = self.copas[SMALL_COPA]
+        self._generate_calendar(copa)
+        self._play_all(copa)
+        self.env.cr.flush()
+        self.env.invalidate_all()
+        field_names = ['team_id', 'position', 'matches_played', 'matches_won',
+                  'runs_scored', 'runs_allowed', 'head_to_head']
+        incremental = copa.standings_ids.sorted('team_id').read(field_names)
+        copa._compute_standings()
+        self.env.cr.flush()
+        self.env.invalidate_all()
+        self.assertEqual(copa.standings_ids.sorted('team_id').read(field_names), incremental)
+
+
+@tagged('post_install', '-at_install', 'beiscool_performance')
+class TestBeiscoolRoutesPerformance(BeiscoolDataMixin, HttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.copas = {}
+        for size in (SMALL_COPA, LARGE_COPA):
+            copa = cls._create_copa(size)
+            copa.action_generate_calendar()
+            for match in copa.match_ids[:len(copa.match_ids) // 2]:
+                match.write(cls._result_values(match))
+            cls.copas[size] = copa
+        cls.env.cr.flush()
+
+    def _get_page(self, url):
+        response = self.assertWallTime(WALL_TIME_CEILINGS['page'], self.url_open, url)
+        self.assertEqual(response.status_code, 200, url)
+        return response
+
+    def _assert_page_scales(self, urls):
+        """
+        La primera visita (sin caché) no crece con el tamaño de la copa y
+        las visitas siguientes salen de la caché con pocas consultas.
+        """
+        small_url, large_url = urls
+        cold_small = self._count_queries(self._get_page, small_url)
+        cold_large = self._count_queries(self._get_page, large_url)
+        self.assertLessEqual(
+            cold_large, cold_small + PAGE_QUERY_SLACK,
+            '%s: %s consultas con %s equipos contra %s con %s' % (
+                large_url, cold_large, LARGE_COPA, cold_small, SMALL_COPA),
+        )
+        return cold_large
+
+    def test_copa_page(self):
+        self._assert_page_scales([
+            '/copa/%s' % self.copas[size].id for size in (SMALL_COPA, LARGE_COPA)
+        ])
+        hot = self._count_queries(self._get_page, '/copa/%s' % self.copas[LARGE_COPA].id)
+        self.assertLessEqual(hot, CACHED_PAGE_QUERIES)
+
+    def test_page_cache_per_session(self):
+        """La caché guarda solo el cuerpo: cada sesión recibe su propio token CSRF"""
+        for url in ('/copa/%s' % self.copas[SMALL_COPA].id, '/copas'):
+            tokens = []
+            for _visit in range(2):
+                self.opener.cookies.clear()
+                html = self._get_page(url).text
+                tokens.append(re.search(r'csrf_token: "([^"]+)"', html).group(1))
+            self.assertNotEqual(tokens[0], tokens[1], url)
+
+    def test_copa_page_etag_new_player(self):
+        """Agregar un jugador cambia la cantidad de jugadores de la página de la copa"""
+        copa = self.copas[SMALL_COPA]
+        url = '/copa/%s' % copa.id
+        etag = self._get_page(url).headers['ETag']
+        self.env['beiscool.player'].create({
+            'name': 'Jugador nuevo',
+            'team_ids': [Command.set(copa.team_ids[:1].ids)],
+        })
+        self.env.cr.flush()
+        response = self.url_open(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_team_page(self):
+        self._assert_page_scales([
+            '/equipo/%s' % self.copas[size].team_ids[0].id for size in (SMALL_COPA, LARGE_COPA)
+        ])
+
+    def test_copas_list(self):
+        self._get_page('/copas')
+        hot = self._count_queries(self._get_page, '/copas')
+        self.assertLessEqual(hot, CACHED_PAGE_QUERIES)
+        # Más copas no agregan consultas a la página (contadores guardados y prefetch)
+        cold_before = self._count_queries(self._get_page, '/copas?state=draft')
+        for _index in range(6):
+            self._create_copa(2, players_per_team=1)
+        cold_after = self._count_queries(self._get_page, '/copas?state=draft')
+        self.assertLessEqual(cold_after, cold_before + PAGE_QUERY_SLACK)
+
+    def test_ics_feed(self):
+        copa = self.copas[LARGE_COPA]
+        url = '/beiscool/ics/copa/%s.ics' % copa.id
+        response = self._get_page(url)
+        self.assertTrue(response.headers['Content-Type'].startswith('text/calendar'))
+        self.assertEqual(response.text.count('BEGIN:VEVENT'), len(copa.match_ids))
+        etag = response.headers['ETag']
+
+        # Un cliente al día recibe 304 con la consulta agregada y poco más
+        cached = {}
+        queries = self._count_queries(
+            lambda: cached.update(response=self.url_open(url, headers={'If-None-Match': etag})))
+        self.assertEqual(cached['response'].status_code, 304)
+        self.assertLessEqual(queries, CACHED_PAGE_QUERIES)
+
+        # Un partido menos invalida el ETag (dentro de la prueba todas las
+        # escrituras comparten la fecha de la transacción)
+        copa.match_ids.filtered(lambda match: match.state != 'played')[-1].unlink()
+        self.env.cr.flush()
+        response = self.url_open(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_ics_feed_team_rename(self):
+        """Renombrar un equipo cambia los eventos aunque ningún partido cambie"""
+        team = self.copas[SMALL_COPA].team_ids[0]
+        url = '/beiscool/ics/team/%s.ics' % team.id
+        etag = self._get_page(url).headers['ETag']
+        team.name = 'Equipo renombrado'
+        self.env.cr.flush()
+        response = self.url_open(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertIn('Equipo renombrado', response.text)
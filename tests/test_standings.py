@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import tagged
+
+from .common import BeiscoolPerformanceCase
+
+
+@tagged('post_install', '-at_install')
+class TestBeiscoolHeadToHead(BeiscoolPerformanceCase):
+
+    def setUp(self):
+        super().setUp()
+        self.copa = self._create_copa(2, rounds=2)
+        self.copa.action_generate_calendar()
+        self.first, self.second = self.copa.match_ids.sorted('sequence')
+        self.home, self.away = self.first.home_team_id, self.first.away_team_id
+
+    def _results(self):
+        self.env['beiscool.standings']._flush_pending_standings()
+        rows = {row.team_id: row for row in self.copa.standings_ids}
+        return (
+            rows[self.home].get_head_to_head_result(self.away),
+            rows[self.away].get_head_to_head_result(self.home),
+        )
+
+    def test_tie_is_symmetric(self):
+        """Un empate no cuenta como victoria de ningún lado"""
+        self.first.write({'home_runs': 3, 'away_runs': 3, 'state': 'played'})
+        self.assertEqual(self._results(), (0, 0))
+
+    def test_win_and_tie(self):
+        self.first.write({'home_runs': 5, 'away_runs': 2, 'state': 'played'})
+        self.second.write({'home_runs': 4, 'away_runs': 4, 'state': 'played'})
+        self.assertEqual(self._results(), (1, -1))
+
+    def test_missing_rows_rebuild(self):
+        """Sin fila del equipo, una diferencia negativa reconstruye la copa en lugar de crear valores negativos"""
+        self.first.write({'home_runs': 5, 'away_runs': 2, 'state': 'played'})
+        self.second.write({'home_runs': 1, 'away_runs': 3, 'state': 'played'})
+        self.env['beiscool.standings']._flush_pending_standings()
+        self.copa.standings_ids.unlink()
+        self.second.unlink()
+        self.env['beiscool.standings']._flush_pending_standings()
+        self.env.invalidate_all()
+        rows = {row.team_id: row for row in self.copa.standings_ids}
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[self.home].matches_played, 1)
+        self.assertEqual(rows[self.home].matches_won, 1)
+        self.assertEqual(rows[self.away].matches_lost, 1)
+        self.assertEqual(self.home.matches_played, 1)
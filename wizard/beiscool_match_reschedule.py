@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime, time, timedelta
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+
+class BeiscoolMatchReschedule(models.TransientModel):
+    _name = 'beiscool.match.reschedule'
+    _description = 'Reprogramar Partidos'
+
+    copa_id = fields.Many2one(
+        'beiscool.copa',
+        string='Copa',
+        required=True,
+    )
+
+    date_from = fields.Date(
+        string='Suspendidos Desde',
+        help='Primer día suspendido (por ejemplo, un fin de semana de lluvia)',
+    )
+
+    date_to = fields.Date(
+        string='Suspendidos Hasta',
+    )
+
+    match_ids = fields.Many2many(
+        'beiscool.match',
+        string='Partidos',
+        domain="[('copa_id', '=', copa_id), ('state', '!=', 'played')]",
+    )
+
+    after_date = fields.Datetime(
+        string='Reprogramar Desde',
+        required=True,
+        default=fields.Datetime.now,
+        help='Los partidos se ubican en el primer horario libre posterior',
+    )
+
+    @api.model
+    def default_get(self, fields_list):
+        values = super(BeiscoolMatchReschedule, self).default_get(fields_list)
+        context = self.env.context
+        if context.get('active_model') == 'beiscool.match' and context.get('active_ids'):
+            matches = self.env['beiscool.match'].browse(context['active_ids'])
+            if len(matches.copa_id) > 1:
+                raise UserError('Seleccione partidos de una sola copa.')
+            values['copa_id'] = matches.copa_id.id
+            values['match_ids'] = [fields.Command.set(matches.filtered(lambda m: m.state != 'played').ids)]
+        elif context.get('active_model') == 'beiscool.copa' and context.get('active_id'):
+            values['copa_id'] = context['active_id']
+        return values
+
+    @api.onchange('copa_id', 'date_from', 'date_to')
+    def _onchange_dates(self):
+        """Carga los partidos no jugados del rango suspendido"""
+        if not self.copa_id or not self.date_from:
+            return
+        date_to = self.date_to or self.date_from
+        self.match_ids = self.env['beiscool.match'].search([
+            ('copa_id', '=', self.copa_id.id),
+            ('state', '!=', 'played'),
+            ('match_date', '>=', datetime.combine(self.date_from, time.min)),
+            ('match_date', '<', datetime.combine(date_to + timedelta(days=1), time.min)),
+        ])
+        self.after_date = datetime.combine(date_to + timedelta(days=1), time.min)
+
+    def action_confirm(self):
+        self.ensure_one()
+        if not self.match_ids:
+            raise UserError('No hay partidos para reprogramar.')
+        unplaced = self.copa_id._reschedule_matches(self.match_ids, self.after_date)
+        moved = len(self.match_ids) - len(unplaced)
+        message = 'Partidos reprogramados: %s.' % moved
+        if unplaced:
+            message += ' Sin horario libre: %s.' % ', '.join(unplaced.mapped('name'))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': message,
+                'type': 'warning' if unplaced else 'success',
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }